@@ -0,0 +1,73 @@
+# Microbenchmark da carga do veículo: lista com varredura x CargaVeiculo indexada por destino
+# Simula um veículo com capacidade A cheio de encomendas para S destinos dando uma volta
+# completa na rota: em cada parada descarrega o que é do ponto e recarrega até a capacidade.
+# O modelo antigo copia e percorre a lista inteira e usa list.remove (O(n) por remoção).
+# Uso: python benchmarks/bench_carga.py -A 1000 5000 10000 -S 50
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simulacao_logistica import CargaVeiculo
+
+class EncomendaFalsa:
+    __slots__ = ("id", "destino")
+
+    def __init__(self, id, destino):
+        self.id = id
+        self.destino = destino
+
+def gerar_encomendas(quantidade, S, rng):
+    return [EncomendaFalsa(i, rng.randrange(S)) for i in range(quantidade)]
+
+# Modelo antigo (o mesmo laço de descarregamento que Veiculo.run usava)
+def volta_lista(A, S, encomendas):
+    fonte = itertools.cycle(encomendas)  # A recarga reaproveita as encomendas geradas
+    carga = [next(fonte) for _ in range(A)]
+    for local in range(S):
+        for encomenda in carga[:]:
+            if encomenda.destino == local:
+                carga.remove(encomenda)
+        while len(carga) < A:
+            carga.append(next(fonte))
+
+def volta_indexada(A, S, encomendas):
+    fonte = itertools.cycle(encomendas)  # A recarga reaproveita as encomendas geradas
+    carga = CargaVeiculo()
+    for _ in range(A):
+        encomenda = next(fonte)
+        carga.adicionar(encomenda, encomenda.destino)
+    for local in range(S):
+        while carga.proxima(local) is not None:
+            carga.retirar(local)
+        while len(carga) < A:
+            encomenda = next(fonte)
+            carga.adicionar(encomenda, encomenda.destino)
+
+def medir(funcao, A, S, encomendas, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(A, S, encomendas)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark da carga do veículo (lista x indexada por destino).")
+    parser.add_argument("-A", type=int, nargs="+", default=[1000, 2000, 5000, 10000], help="Capacidades a medir")
+    parser.add_argument("-S", type=int, default=50, help="Número de pontos (destinos)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições por medida (vale a melhor)")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"S={args.S}, uma volta completa na rota por medida")
+    print(f"{'A':>7} {'lista (ms)':>12} {'indexada (ms)':>14} {'ganho':>8}")
+    for A in args.A:
+        encomendas = gerar_encomendas(2 * A, args.S, random.Random(args.semente))
+        lista = medir(volta_lista, A, args.S, encomendas, args.repeticoes)
+        indexada = medir(volta_indexada, A, args.S, encomendas, args.repeticoes)
+        print(f"{A:>7} {lista * 1000:>12.2f} {indexada * 1000:>14.2f} {lista / indexada:>7.1f}x")
@@ -0,0 +1,123 @@
+# Benchmark do ciclo de vida das encomendas: espera ativa x notificação
+# Compara o modelo antigo (um thread por encomenda checando horario_carregado a cada 0,1 s
+# e um thread por ponto dormindo em loop) com o atual, em que o veículo chama carregar/entregar
+# do ArmazemEncomendas e nenhuma encomenda ou ponto tem thread.
+# Em ambos, um "veículo" carrega e entrega as P encomendas de forma espaçada ao longo de
+# "duracao" segundos, então o trabalho útil é o mesmo e a diferença é só o custo de espera.
+# Uso: python benchmarks/bench_ciclo_vida.py -P 5000 -S 50 --duracao 5
+import argparse
+import os
+import resource
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from armazem_encomendas import ArmazemEncomendas
+from simulacao_logistica import InterfaceNula, Ponto
+
+# Escritor de rastros que descarta os registros (o benchmark mede só a espera, não o disco)
+class RastrosDescartados:
+    def registrar(self, registro):
+        pass
+
+# Encomenda no modelo antigo: thread que espera ativamente ser carregada e depois espera a entrega
+class EncomendaPolling(threading.Thread):
+    def __init__(self, id):
+        super().__init__(daemon=True)
+        self.id = id
+        self.horario_carregado = None
+        self.delivered_event = threading.Event()
+
+    def run(self):
+        while self.horario_carregado is None:
+            time.sleep(0.1)
+        self.delivered_event.wait()
+
+# Ponto no modelo antigo: thread que só dorme
+class PontoPolling(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.running = True
+
+    def run(self):
+        while self.running:
+            time.sleep(0.1)
+
+# Carrega e entrega todas as encomendas espalhando o trabalho ao longo de "duracao" segundos
+def conduzir(encomendas, duracao, carregar, entregar):
+    passo = duracao / len(encomendas)
+    inicio = time.perf_counter()
+    for indice, encomenda in enumerate(encomendas):
+        carregar(encomenda)
+        entregar(encomenda)
+        espera = inicio + (indice + 1) * passo - time.perf_counter()
+        if espera > 0:
+            time.sleep(espera)
+
+def cenario_polling(P, S, duracao):
+    pontos = [PontoPolling() for _ in range(S)]
+    encomendas = [EncomendaPolling(i) for i in range(P)]
+    for thread in pontos + encomendas:
+        thread.start()
+
+    def carregar(encomenda):
+        encomenda.horario_carregado = time.time()
+
+    def entregar(encomenda):
+        encomenda.delivered_event.set()
+
+    conduzir(encomendas, duracao, carregar, entregar)
+    for encomenda in encomendas:
+        encomenda.join()
+    for ponto in pontos:
+        ponto.running = False
+    for ponto in pontos:
+        ponto.join()
+
+def cenario_notificacao(P, S, duracao):
+    pontos = [Ponto(i) for i in range(S)]
+    interface = InterfaceNula()
+    rastros = RastrosDescartados()
+    armazem = ArmazemEncomendas(rastros)
+    encomendas = [armazem.criar(i, i % S, (i + 1) % S, time.time()) for i in range(P)]
+    for encomenda in encomendas:
+        pontos[armazem.origem[encomenda]].enqueue_encomenda(encomenda)
+        interface.update_point(armazem.origem[encomenda], pontos[armazem.origem[encomenda]].tamanho_fila())
+
+    def carregar(encomenda):
+        pontos[armazem.origem[encomenda]].get_encomenda()
+        armazem.carregar(encomenda, 0, time.time())
+
+    def entregar(encomenda):
+        armazem.entregar(encomenda, time.time())
+
+    conduzir(encomendas, duracao, carregar, entregar)
+
+# Executa um cenário e mede tempo de parede, CPU e trocas de contexto do processo
+def medir(cenario, P, S, duracao):
+    antes = resource.getrusage(resource.RUSAGE_SELF)
+    inicio = time.perf_counter()
+    cenario(P, S, duracao)
+    parede = time.perf_counter() - inicio
+    depois = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        "parede": parede,
+        "cpu": (depois.ru_utime - antes.ru_utime) + (depois.ru_stime - antes.ru_stime),
+        "trocas_voluntarias": depois.ru_nvcsw - antes.ru_nvcsw,
+        "trocas_involuntarias": depois.ru_nivcsw - antes.ru_nivcsw,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do ciclo de vida das encomendas (espera ativa x notificação).")
+    parser.add_argument("-P", type=int, default=5000, help="Número de encomendas")
+    parser.add_argument("-S", type=int, default=50, help="Número de pontos")
+    parser.add_argument("--duracao", type=float, default=5.0, help="Segundos ao longo dos quais as entregas são espalhadas")
+    args = parser.parse_args()
+
+    print(f"P={args.P} S={args.S} duração={args.duracao}s")
+    print(f"{'cenário':<12} {'parede (s)':>10} {'CPU (s)':>9} {'trocas vol.':>12} {'trocas invol.':>14}")
+    for nome, cenario in (("polling", cenario_polling), ("notificacao", cenario_notificacao)):
+        r = medir(cenario, args.P, args.S, args.duracao)
+        print(f"{nome:<12} {r['parede']:>10.2f} {r['cpu']:>9.2f} {r['trocas_voluntarias']:>12} {r['trocas_involuntarias']:>14}")
@@ -0,0 +1,174 @@
+# Benchmark de contenção em um ponto concentrador: filas com três locks x fila com uma camada só
+# C threads ("veículos") disputam o mesmo ponto durante "duracao" segundos. Em cada parada o veículo
+# carrega até a capacidade A, avisa a interface e devolve as encomendas ao ponto (a oferta nunca acaba).
+# O modelo antigo segura o lock_pontos do ponto durante todo o carregamento, inclusive nas chamadas à
+# interface, e retira uma encomenda por vez de uma queue.Queue protegida por mais um fila_lock.
+# O atual usa Ponto: um único lock, retirada em lote (retirar_lote) e interface fora de qualquer lock.
+# O ponto atual é montado por criar_pontos, como nas execuções reais, e é medido duas vezes: como roda por
+# padrão e com --medir-locks (fila_lock envolvido por um LockMedido).
+# Com --verificar-registro N, roda N execuções reais no modo threads com muitos veículos disputando poucos pontos
+# (e trocas de thread forçadas com sys.setswitchinterval), grava o registro de eventos e confere que reproduzir()
+# aceita o registro e chega ao mesmo resumo: as cargas concorrentes têm de aparecer no registro na ordem da fila.
+# Uso: python benchmarks/bench_contencao.py -C 1 2 4 8 16 32 -A 20 --duracao 2
+#      python benchmarks/bench_contencao.py --verificar-registro 6
+import argparse
+import os
+import queue
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from metricas import Metricas
+from simulacao_logistica import CONFIG, InterfaceNula, criar_pontos, main, preparar_diretorio_rastros, reproduzir
+
+# Interface com custo parecido com o da Interface gráfica: cada chamada guarda o estado sob um lock
+class InterfaceEstado:
+    def __init__(self):
+        self.estado_lock = threading.Lock()
+        self.mensagens = deque(maxlen=100)
+        self.filas = {}
+
+    def update_status(self, message):
+        with self.estado_lock:
+            self.mensagens.append(message)
+
+    def update_point(self, point_id, quantidade):
+        with self.estado_lock:
+            self.filas[point_id] = quantidade
+
+class EncomendaFalsa:
+    __slots__ = ("id",)
+
+    def __init__(self, id):
+        self.id = id
+
+# Ponto no modelo antigo: queue.Queue (que já tem lock interno) envolvida em mais um fila_lock
+class PontoAntigo:
+    def __init__(self, id):
+        self.id = id
+        self.fila_encomendas = queue.Queue()
+        self.fila_lock = threading.Lock()
+
+    def enqueue_encomenda(self, encomenda):
+        with self.fila_lock:
+            self.fila_encomendas.put(encomenda)
+
+    def get_encomenda(self):
+        with self.fila_lock:
+            if not self.fila_encomendas.empty():
+                return self.fila_encomendas.get()
+            return None
+
+    def tamanho_fila(self):
+        return self.fila_encomendas.qsize()
+
+def parada_antiga(ponto, lock_ponto, A, interface, veiculo_id):
+    carga = []
+    with lock_ponto:  # O terceiro lock, segurado durante todo o carregamento
+        while len(carga) < A:
+            encomenda = ponto.get_encomenda()
+            if encomenda is None:
+                break
+            carga.append(encomenda)
+            interface.update_status(f"Veículo {veiculo_id} carregou encomenda {encomenda.id} no ponto {ponto.id}.")
+    interface.update_point(ponto.id, ponto.tamanho_fila())
+    return carga
+
+def parada_nova(ponto, lock_ponto, A, interface, veiculo_id):
+    if not ponto.ocupar_doca():
+        return []
+    carga = ponto.retirar_lote(A)
+    for encomenda in carga:
+        interface.update_status(f"Veículo {veiculo_id} carregou encomenda {encomenda.id} no ponto {ponto.id}.")
+    interface.update_point(ponto.id, ponto.tamanho_fila())
+    ponto.liberar_doca()
+    return carga
+
+def criar_ponto(docas, medir_locks): # Ponto concentrador montado como em main()
+    return criar_pontos({"numero_pontos": 1, "docas": docas, "medir_locks": medir_locks}, None, Metricas())[0]
+
+def medir(parada, ponto, C, A, duracao):
+    interface = InterfaceEstado()
+    lock_ponto = threading.Lock()
+    for i in range(C * A):  # Oferta suficiente para todos os veículos encherem ao mesmo tempo
+        ponto.enqueue_encomenda(EncomendaFalsa(i))
+    parar = threading.Event()
+    carregadas = [0] * C
+
+    def veiculo(veiculo_id):
+        while not parar.is_set():
+            carga = parada(ponto, lock_ponto, A, interface, veiculo_id)
+            carregadas[veiculo_id] += len(carga)
+            for encomenda in carga:  # Devolve ao ponto para manter a oferta
+                ponto.enqueue_encomenda(encomenda)
+
+    threads = [threading.Thread(target=veiculo, args=(i,)) for i in range(C)]
+    cpu_antes = resource.getrusage(resource.RUSAGE_SELF)
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duracao)
+    parar.set()
+    for thread in threads:
+        thread.join()
+    parede = time.perf_counter() - inicio
+    cpu_depois = resource.getrusage(resource.RUSAGE_SELF)
+    trocas = (cpu_depois.ru_nvcsw - cpu_antes.ru_nvcsw) + (cpu_depois.ru_nivcsw - cpu_antes.ru_nivcsw)
+    return sum(carregadas) / parede, trocas
+
+# Execução real sob contenção com registro de eventos, seguida da reprodução do registro; devolve o erro ou None
+def verificar_registro(semente, S=2, C=20, A=25, P=120):
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Trocas de thread a todo momento, para expor a ordem do registro
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            registro = os.path.join(pasta, "eventos.jsonl")
+            config = {**CONFIG, "numero_pontos": S, "numero_veiculos": C, "capacidade_veiculo": A, "numero_encomendas": P,
+                      "semente": semente, "modo": "threads", "registro_eventos": registro, "formato_rastros": "jsonl",
+                      "diretorio_rastros": os.path.join(pasta, "original")}
+            preparar_diretorio_rastros(config["diretorio_rastros"])
+            original = main(InterfaceNula(), config)
+            saida = {"diretorio_rastros": os.path.join(pasta, "reproduzido"), "formato_rastros": "jsonl"}
+            preparar_diretorio_rastros(saida["diretorio_rastros"])
+            try:
+                reproduzido = reproduzir(registro, InterfaceNula(), saida)
+            except ValueError as e:
+                return str(e)
+            for chave in ("encomendas_entregues", "makespan"):
+                if reproduzido[chave] != original[chave]:
+                    return f"{chave} difere: {original[chave]} x {reproduzido[chave]}"
+            return None
+    finally:
+        sys.setswitchinterval(intervalo)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Contenção em um ponto concentrador (três locks x uma camada com retirada em lote).")
+    parser.add_argument("-C", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Números de veículos a medir")
+    parser.add_argument("-A", type=int, default=20, help="Capacidade de cada veículo")
+    parser.add_argument("--docas", type=int, default=None, help="Docas do ponto no modelo atual (padrão: sem limite)")
+    parser.add_argument("--duracao", type=float, default=2.0, help="Segundos por medida")
+    parser.add_argument("--verificar-registro", type=int, default=0, metavar="N",
+                        help="Em vez de medir, grava e reproduz N execuções com carga concorrente (modo threads)")
+    args = parser.parse_args()
+
+    if args.verificar_registro:
+        falhas = 0
+        for semente in range(args.verificar_registro):
+            erro = verificar_registro(semente)
+            falhas += erro is not None
+            print(f"semente {semente}: {'ok' if erro is None else erro}")
+        sys.exit(1 if falhas else 0)
+
+    print(f"A={args.A}, docas={args.docas or 'sem limite'}, {args.duracao:g} s por medida (vazão em encomendas carregadas/s)")
+    print(f"{'C':>4} {'antigo':>12} {'trocas':>9} {'atual':>12} {'trocas':>9} {'ganho':>7} {'medindo locks':>14} {'ganho':>7}")
+    for C in args.C:
+        antigo, trocas_antigo = medir(parada_antiga, PontoAntigo(0), C, args.A, args.duracao)
+        atual, trocas_atual = medir(parada_nova, criar_ponto(args.docas, False), C, args.A, args.duracao)
+        medindo, _ = medir(parada_nova, criar_ponto(args.docas, True), C, args.A, args.duracao)
+        print(f"{C:>4} {antigo:>12.0f} {trocas_antigo:>9} {atual:>12.0f} {trocas_atual:>9} {atual / antigo:>6.1f}x "
+              f"{medindo:>14.0f} {medindo / antigo:>6.1f}x")
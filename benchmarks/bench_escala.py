@@ -0,0 +1,182 @@
+# Benchmark de escala do núcleo da simulação, com comparação contra uma base gravada
+# Roda a simulação sem interface em uma matriz de tamanhos (S, C, A, P) com sementes fixas. Cada
+# execução é um processo novo, para que o pico de memória de uma não contamine a outra, e mede tempo
+# de parede, tempo de CPU, pico de RSS, pico de threads e eventos processados por segundo (modo eventos).
+# Com --comparar, mostra a variação em relação à base e sai com código 1 se algo piorou além da
+# tolerância ou se o resultado simulado (makespan) mudou para a mesma semente.
+# Uso: python benchmarks/bench_escala.py --comparar benchmarks/base_escala.json
+#      python benchmarks/bench_escala.py --salvar-base benchmarks/base_escala.json
+#      python benchmarks/bench_escala.py --tamanhos 5,3,10,60 --modo threads
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+DIRETORIO_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, DIRETORIO_SRC)
+
+TAMANHOS_PADRAO = ["10,3,20,1000", "30,10,50,10000", "100,30,100,50000"]
+# Medidas comparadas com a base: nome -> True se maior é melhor
+MEDIDAS = {
+    "tempo_parede": False,
+    "tempo_cpu": False,
+    "rss_pico_kb": False,
+    "threads_pico": False,
+    "eventos_por_segundo": True,
+}
+
+# Executa uma configuração neste processo e devolve as medidas (chamado no processo filho)
+def executar_uma(config):
+    from simulacao_logistica import InterfaceNula, main
+
+    threads_pico = [threading.active_count()]
+    parar = threading.Event()
+
+    def amostrar_threads():  # Conta os threads a cada 5 ms (descontando este)
+        while not parar.wait(0.005):
+            threads_pico[0] = max(threads_pico[0], threading.active_count() - 1)
+
+    amostrador = threading.Thread(target=amostrar_threads, daemon=True)
+    amostrador.start()
+    uso_antes = resource.getrusage(resource.RUSAGE_SELF)
+    inicio = time.perf_counter()
+    resumo = main(InterfaceNula(), config)
+    parede = time.perf_counter() - inicio
+    uso_depois = resource.getrusage(resource.RUSAGE_SELF)
+    parar.set()
+    amostrador.join()
+
+    rss = uso_depois.ru_maxrss  # KB no Linux, bytes no macOS
+    if sys.platform == "darwin":
+        rss //= 1024
+    eventos = resumo["eventos_processados"]
+    return {
+        "tempo_parede": parede,
+        "tempo_cpu": (uso_depois.ru_utime - uso_antes.ru_utime) + (uso_depois.ru_stime - uso_antes.ru_stime),
+        "rss_pico_kb": rss,
+        "threads_pico": threads_pico[0],
+        "eventos_por_segundo": eventos / parede if eventos else None,
+        "encomendas_entregues": resumo["encomendas_entregues"],
+        "makespan": resumo["makespan"],
+    }
+
+# Roda uma configuração "repeticoes" vezes, cada uma em um processo novo, e fica com a mediana
+def medir(S, C, A, P, modo, formato_rastros, semente, repeticoes):
+    execucoes = []
+    for _ in range(repeticoes):
+        diretorio = tempfile.mkdtemp(prefix="bench_escala_")
+        config = {
+            "numero_pontos": S, "numero_veiculos": C, "capacidade_veiculo": A, "numero_encomendas": P,
+            "modo": modo, "semente": semente, "inicio_relogio": 0.0,
+            "diretorio_rastros": diretorio, "formato_rastros": formato_rastros,
+        }
+        try:
+            processo = subprocess.run([sys.executable, os.path.abspath(__file__), "--executar-uma", json.dumps(config)],
+                                      capture_output=True, text=True, check=True)
+        finally:
+            shutil.rmtree(diretorio, ignore_errors=True)
+        execucoes.append(json.loads(processo.stdout))
+
+    resultado = {"S": S, "C": C, "A": A, "P": P, "modo": modo, "formato_rastros": formato_rastros, "semente": semente}
+    for nome in MEDIDAS:
+        valores = [execucao[nome] for execucao in execucoes if execucao[nome] is not None]
+        resultado[nome] = statistics.median(valores) if valores else None
+    resultado["encomendas_entregues"] = execucoes[0]["encomendas_entregues"]
+    resultado["makespan"] = execucoes[0]["makespan"]
+    return resultado
+
+def chave(resultado):
+    return (resultado["S"], resultado["C"], resultado["A"], resultado["P"], resultado["modo"], resultado["formato_rastros"], resultado["semente"])
+
+# Variação relativa de cada medida e lista de regressões (acima da tolerância ou resultado diferente)
+# Medidas de tempo só contam como regressão se o tempo de parede mudou mais que "minimo" segundos,
+# para o ruído das execuções curtas não ser acusado.
+def comparar(resultado, base, tolerancia, minimo):
+    variacoes = {}
+    regressoes = []
+    ruido = abs(resultado["tempo_parede"] - base["tempo_parede"]) < minimo
+    for nome, maior_melhor in MEDIDAS.items():
+        atual, anterior = resultado[nome], base.get(nome)
+        if atual is None or not anterior:
+            continue
+        variacao = atual / anterior - 1
+        variacoes[nome] = variacao
+        piorou = -variacao if maior_melhor else variacao
+        if nome == "threads_pico":
+            if atual > anterior:
+                regressoes.append(f"threads_pico {anterior} -> {atual}")
+        elif piorou > tolerancia and not (ruido and nome != "rss_pico_kb"):
+            regressoes.append(f"{nome} {variacao:+.1%}")
+    if resultado["modo"] == "eventos" and resultado["makespan"] != base.get("makespan"):
+        regressoes.append("makespan diferente da base (comportamento mudou)")
+    return variacoes, regressoes
+
+def formatar(valor, variacao=None, casas=2):
+    if valor is None:
+        return "-"
+    texto = f"{valor:.{casas}f}"
+    return texto if variacao is None else f"{texto} ({variacao:+.0%})"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de escala da simulação com comparação contra uma base.")
+    parser.add_argument("--tamanhos", nargs="+", default=TAMANHOS_PADRAO, help="Configurações S,C,A,P (padrão: três tamanhos)")
+    parser.add_argument("--modo", nargs="+", choices=["eventos", "threads"], default=["eventos"], help="Motores de execução (padrão: eventos)")
+    parser.add_argument("--formato-rastros", default="jsonl", help="Formato dos rastros gravados (padrão: jsonl)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por configuração (vale a mediana)")
+    parser.add_argument("--comparar", default=None, help="Arquivo de base para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="Piora relativa tolerada antes de acusar regressão (padrão: 0,15)")
+    parser.add_argument("--minimo", type=float, default=0.05, help="Diferença de tempo (s) abaixo da qual não há regressão de tempo (padrão: 0,05)")
+    parser.add_argument("--salvar-base", default=None, help="Grava os resultados neste arquivo para servir de base")
+    parser.add_argument("--executar-uma", default=None, help=argparse.SUPPRESS)  # Uso interno: processo filho
+    args = parser.parse_args()
+
+    if args.executar_uma:
+        print(json.dumps(executar_uma(json.loads(args.executar_uma))))
+        sys.exit(0)
+
+    base = {}
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            base = {chave(resultado): resultado for resultado in json.load(arquivo)["resultados"]}
+
+    resultados = []
+    regressoes_total = 0
+    print(f"Python {platform.python_version()}, {platform.machine()}, semente {args.semente}, mediana de {args.repeticoes} execuções")
+    print(f"{'S':>4} {'C':>4} {'A':>4} {'P':>6} {'modo':<8} {'parede (s)':>16} {'CPU (s)':>16} {'RSS (MB)':>16} {'threads':>7} {'eventos/s':>18}")
+    for tamanho in args.tamanhos:
+        S, C, A, P = (int(valor) for valor in tamanho.split(","))
+        for modo in args.modo:
+            resultado = medir(S, C, A, P, modo, args.formato_rastros, args.semente, args.repeticoes)
+            resultados.append(resultado)
+            anterior = base.get(chave(resultado))
+            variacoes, regressoes = comparar(resultado, anterior, args.tolerancia, args.minimo) if anterior else ({}, [])
+            rss_mb = resultado["rss_pico_kb"] / 1024
+            print(f"{S:>4} {C:>4} {A:>4} {P:>6} {modo:<8} "
+                  f"{formatar(resultado['tempo_parede'], variacoes.get('tempo_parede')):>16} "
+                  f"{formatar(resultado['tempo_cpu'], variacoes.get('tempo_cpu')):>16} "
+                  f"{formatar(rss_mb, variacoes.get('rss_pico_kb'), 1):>16} "
+                  f"{resultado['threads_pico']:>7} "
+                  f"{formatar(resultado['eventos_por_segundo'], variacoes.get('eventos_por_segundo'), 0):>18}")
+            if args.comparar and anterior is None:
+                print("      sem base para esta configuração")
+            for regressao in regressoes:
+                print(f"      REGRESSÃO: {regressao}")
+            regressoes_total += len(regressoes)
+
+    if args.salvar_base:
+        with open(args.salvar_base, "w") as arquivo:
+            json.dump({"python": platform.python_version(), "maquina": platform.machine(), "resultados": resultados}, arquivo, indent=2)
+            arquivo.write("\n")
+        print(f"Base gravada em {args.salvar_base}")
+    if args.comparar:
+        print(f"{regressoes_total} regressões" if regressoes_total else "Nenhuma regressão em relação à base.")
+    sys.exit(1 if regressoes_total else 0)
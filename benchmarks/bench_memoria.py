@@ -0,0 +1,135 @@
+# Memória por encomenda e custo do resumo final: objetos x ArmazemEncomendas
+# Compara três representações de P encomendas enfileiradas nos pontos:
+#   thread  - uma subclasse de threading.Thread por encomenda, com Event próprio (modelo original, threads não iniciados)
+#   objeto  - um objeto com __dict__ e Event por encomenda (modelo anterior ao armazém)
+#   armazem - colunas em arrays tipados; as filas guardam só índices
+# A memória é medida com tracemalloc (bytes alocados por encomenda, incluindo as filas) e o resumo
+# é a mesma passada final de encerrar_execucao (entregas, makespan e latências ordenadas).
+# O histórico dos veículos (uma carga e uma entrega por encomenda) também cresce com P e é medido à parte:
+# uma string por ação nos modelos com objetos, HistoricoVeiculo (registros em arrays tipados) com o armazém.
+# Uso: python benchmarks/bench_memoria.py -P 10000 100000 -S 50
+import argparse
+import gc
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from armazem_encomendas import ArmazemEncomendas
+from historico_veiculos import HistoricoVeiculo, CARREGOU, ENTREGOU
+
+class EncomendaThread(threading.Thread):
+    def __init__(self, id, origem, destino, horario):
+        super().__init__()
+        self.id = id
+        self.origem = origem
+        self.destino = destino
+        self.horario_criacao = horario
+        self.horario_carregado = None
+        self.horario_descarregado = None
+        self.veiculo_id = None
+        self.delivered_event = threading.Event()
+
+class EncomendaObjeto:
+    def __init__(self, id, origem, destino, horario):
+        self.id = id
+        self.origem = origem
+        self.destino = destino
+        self.horario_criacao = horario
+        self.horario_carregado = None
+        self.horario_descarregado = None
+        self.veiculo_id = None
+        self.delivered_event = threading.Event()
+
+def criar_objetos(classe, pares):
+    filas = [deque() for _ in range(max(origem for origem, _ in pares) + 1)]
+    encomendas = []
+    for i, (origem, destino) in enumerate(pares):
+        encomenda = classe(i, origem, destino, float(i))
+        encomendas.append(encomenda)
+        filas[origem].append(encomenda)
+    return encomendas, filas
+
+def criar_armazem(pares):
+    filas = [deque() for _ in range(max(origem for origem, _ in pares) + 1)]
+    armazem = ArmazemEncomendas()
+    for i, (origem, destino) in enumerate(pares):
+        filas[origem].append(armazem.criar(i, origem, destino, float(i)))
+    return armazem, filas
+
+def historico_texto(pares):  # Como o veículo guardava o histórico antes: uma string por ação
+    historico = []
+    for i, (origem, destino) in enumerate(pares):
+        historico.append(f"Carregou encomenda {i} no ponto {origem}")
+        historico.append(f"Entregou encomenda {i} no ponto {destino}")
+    return historico
+
+def historico_compacto(pares):
+    historico = HistoricoVeiculo()
+    for i, (origem, destino) in enumerate(pares):
+        historico.registrar(CARREGOU, i, origem)
+        historico.registrar(ENTREGOU, i, destino)
+    return historico
+
+def entregar_objetos(encomendas):
+    for encomenda in encomendas:
+        encomenda.horario_carregado = encomenda.horario_criacao + 1.0
+        encomenda.horario_descarregado = encomenda.horario_criacao + 2.0
+
+def entregar_armazem(armazem):
+    for indice in range(len(armazem)):
+        armazem.carregar(indice, 0, armazem.horario_criacao[indice] + 1.0)
+        armazem.entregar(indice, armazem.horario_criacao[indice] + 2.0)
+
+def resumo_objetos(encomendas):  # A passada que encerrar_execucao fazia sobre a lista de objetos
+    entregues = [e for e in encomendas if e.horario_descarregado is not None]
+    makespan = max(e.horario_descarregado for e in entregues)
+    latencias = sorted(e.horario_descarregado - e.horario_criacao for e in entregues)
+    return len(entregues), makespan, latencias
+
+def medir_memoria(criar, P):
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    estrutura = criar()
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return estrutura, (depois - antes) / P
+
+def medir_tempo(funcao, *args):
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memória por encomenda e custo do resumo final (objetos x armazém).")
+    parser.add_argument("-P", type=int, nargs="+", default=[10000, 100000], help="Números de encomendas")
+    parser.add_argument("-S", type=int, default=50, help="Número de pontos")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"S={args.S}")
+    print(f"{'P':>8} {'modelo':<8} {'bytes/encomenda':>16} {'histórico':>10} {'resumo (ms)':>12}")
+    for P in args.P:
+        rng = random.Random(args.semente)
+        pares = [(rng.randrange(args.S), rng.randrange(args.S)) for _ in range(P)]
+        historico, por_texto = medir_memoria(lambda: historico_texto(pares), P)
+        del historico
+        historico, por_compacto = medir_memoria(lambda: historico_compacto(pares), P)
+        del historico
+        for nome, classe in (("thread", EncomendaThread), ("objeto", EncomendaObjeto)):
+            (encomendas, filas), por_encomenda = medir_memoria(lambda: criar_objetos(classe, pares), P)
+            entregar_objetos(encomendas)
+            tempo = medir_tempo(resumo_objetos, encomendas)
+            print(f"{P:>8} {nome:<8} {por_encomenda:>16.0f} {por_texto:>10.0f} {tempo * 1000:>12.1f}")
+            del encomendas, filas
+        (armazem, filas), por_encomenda = medir_memoria(lambda: criar_armazem(pares), P)
+        entregar_armazem(armazem)
+        tempo = medir_tempo(armazem.resumo, 0.0)
+        print(f"{P:>8} {'armazem':<8} {por_encomenda:>16.0f} {por_compacto:>10.0f} {tempo * 1000:>12.1f}")
+        del armazem, filas
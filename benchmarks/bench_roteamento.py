@@ -0,0 +1,50 @@
+# Compara as políticas de rota com a rota cíclica, na mesma semente
+# Cada política roda no modo eventos com a mesma carga de trabalho (mesma semente) e o relatório
+# mostra makespan e latência média, absolutos e relativos à rota cíclica. Execuções que falharam (linhas da
+# varredura com "erro") são listadas à parte e o script sai com código 1.
+# Uso: python benchmarks/bench_roteamento.py -S 30 -C 5 -A 20 -P 3000 --sementes 0 1 2
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from roteamento import ROTEAMENTOS
+from varredura import executar_varredura
+
+def relativo(valor, referencia): # Variação em relação à rota cíclica ("-" sem a execução cíclica da semente)
+    return f"{valor / referencia - 1:>+10.1%}" if referencia else f"{'-':>10}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara as políticas de rota com a rota cíclica.")
+    parser.add_argument("-S", type=int, default=30)
+    parser.add_argument("-C", type=int, default=5)
+    parser.add_argument("-A", type=int, default=20)
+    parser.add_argument("-P", type=int, default=3000)
+    parser.add_argument("--sementes", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--topologia", default="aleatoria", help="'aleatoria', arquivo de topologia ou 'nenhuma' (tempo de viagem aleatório)")
+    parser.add_argument("--roteamento", nargs="+", choices=list(ROTEAMENTOS), default=list(ROTEAMENTOS))
+    args = parser.parse_args()
+
+    roteamentos = ["ciclico"] + [nome for nome in args.roteamento if nome != "ciclico"]
+    with tempfile.TemporaryDirectory() as diretorio:
+        linhas = executar_varredura([(args.S, args.C, args.A, args.P)], args.sementes, diretorio,
+                                    formato_rastros="binario", roteamentos=roteamentos,
+                                    topologia=None if args.topologia == "nenhuma" else args.topologia)
+
+    falhas = [linha for linha in linhas if linha.get("erro")]
+    linhas = [linha for linha in linhas if not linha.get("erro")]
+
+    # Base de comparação: a rota cíclica da mesma semente
+    base = {linha["semente"]: linha for linha in linhas if linha["roteamento"] == "ciclico"}
+    print(f"S={args.S} C={args.C} A={args.A} P={args.P} topologia={args.topologia}")
+    print(f"{'semente':>7} {'roteamento':<16} {'makespan':>10} {'vs cíclico':>11} {'latência':>10} {'vs cíclico':>11}")
+    for linha in sorted(linhas, key=lambda l: (l["semente"], roteamentos.index(l["roteamento"]))):
+        ref = base.get(linha["semente"])
+        print(f"{linha['semente']:>7} {linha['roteamento']:<16} {linha['makespan']:>10.1f} "
+              f"{relativo(linha['makespan'], ref and ref['makespan'])} {linha['latencia_media']:>10.1f} "
+              f"{relativo(linha['latencia_media'], ref and ref['latencia_media'])}")
+    for linha in falhas:
+        print(f"{linha['semente']:>7} {linha['roteamento']:<16} falhou: {linha['erro']}")
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1,115 @@
+# Armazém compacto das encomendas (struct-of-arrays)
+# Em vez de um objeto por encomenda, cada campo é uma coluna em um array tipado e a encomenda é só
+# um índice inteiro nessas colunas. Filas dos pontos e cargas dos veículos guardam apenas índices,
+# e o estado de cada encomenda ocupa 44 bytes (id 8 + origem 4 + destino 4 + 3 horários x 8 + veículo 4).
+# Horários ainda não ocorridos ficam como NaN e o veículo como -1.
+# O NumPy é opcional: com ele o resumo do fim da execução é calculado sobre as colunas inteiras de uma vez.
+import math
+from array import array
+from instantaneos import Prefixo
+
+try:
+    import numpy as np
+except ImportError:  # Funciona sem NumPy, só o resumo final fica mais lento
+    np = None
+
+NAO_OCORREU = float("nan")
+
+# Situação de uma encomenda, derivada dos horários (não ocupa coluna própria)
+NA_FILA, EM_TRANSITO, ENTREGUE = "na_fila", "em_transito", "entregue"
+
+COLUNAS = ["ids", "origem", "destino", "horario_criacao", "horario_carregado", "horario_descarregado", "veiculo_id"]
+COLUNAS_FIXAS = COLUNAS[:4]  # Sem reutilização de índices, só recebem valores ao criar a encomenda
+
+class ArmazemEncomendas:
+    def __init__(self, rastros=None, reutilizar=False):
+        self.ids = array("q")  # ID da encomenda (igual ao índice, a não ser que os índices sejam reutilizados)
+        self.origem = array("i")
+        self.destino = array("i")
+        self.horario_criacao = array("d")
+        self.horario_carregado = array("d")
+        self.horario_descarregado = array("d")
+        self.veiculo_id = array("i")
+        self.rastros = rastros  # EscritorRastros que grava o rastro na entrega (opcional)
+        self.reutilizar = reutilizar  # Sistema aberto: índices de encomendas entregues voltam a ser usados
+        self.livres = []  # Índices liberados, quando reutilizar = True
+
+    def __len__(self):
+        return len(self.ids)
+
+    def criar(self, id, origem, destino, horario): # Devolve o índice da nova encomenda
+        if self.livres:
+            indice = self.livres.pop()
+            self.ids[indice] = id
+            self.origem[indice] = origem
+            self.destino[indice] = destino
+            self.horario_criacao[indice] = horario
+            self.horario_carregado[indice] = NAO_OCORREU
+            self.horario_descarregado[indice] = NAO_OCORREU
+            self.veiculo_id[indice] = -1
+            return indice
+        self.ids.append(id)
+        self.origem.append(origem)
+        self.destino.append(destino)
+        self.horario_criacao.append(horario)
+        self.horario_carregado.append(NAO_OCORREU)
+        self.horario_descarregado.append(NAO_OCORREU)
+        self.veiculo_id.append(-1)
+        return len(self.ids) - 1
+
+    def carregar(self, indice, veiculo_id, horario): # Chamado pelo veículo ao retirar a encomenda da fila do ponto
+        self.horario_carregado[indice] = horario
+        self.veiculo_id[indice] = veiculo_id
+
+    def entregar(self, indice, horario): # Chamado pelo veículo ao descarregar no destino; grava o rastro
+        self.horario_descarregado[indice] = horario
+        if self.rastros is not None:
+            self.rastros.registrar(self.registro(indice))
+
+    def devolver(self, indice): # A encomenda volta a esperar na fila (veículo retirado da frota ao retomar um instantâneo)
+        self.horario_carregado[indice] = NAO_OCORREU
+        self.veiculo_id[indice] = -1
+
+    def liberar(self, indice): # No sistema aberto, devolve o índice de uma encomenda já entregue para reaproveitamento
+        if self.reutilizar:
+            self.livres.append(indice)
+
+    def registro(self, indice): # Tupla na ordem de rastros.CAMPOS
+        return (self.ids[indice], self.origem[indice], self.destino[indice], self.horario_criacao[indice],
+                self.horario_carregado[indice], self.horario_descarregado[indice], self.veiculo_id[indice])
+
+    def situacao(self, indice):
+        if math.isnan(self.horario_carregado[indice]):
+            return NA_FILA
+        if math.isnan(self.horario_descarregado[indice]):
+            return EM_TRANSITO
+        return ENTREGUE
+
+    # Cópia das colunas (um memcpy por coluna) e dos índices livres, para um instantâneo
+    # Sem reutilização, as colunas fixas só crescem e nem são copiadas aqui (ver instantaneos.Prefixo).
+    def estado(self):
+        colunas = {}
+        for nome in COLUNAS:
+            coluna = getattr(self, nome)
+            colunas[nome] = Prefixo(coluna) if nome in COLUNAS_FIXAS and not self.reutilizar else coluna[:]
+        return {"colunas": colunas, "livres": list(self.livres), "reutilizar": self.reutilizar}
+
+    @classmethod
+    def restaurar(cls, estado, rastros=None):
+        armazem = cls(rastros, estado["reutilizar"])
+        for nome, coluna in estado["colunas"].items():
+            setattr(armazem, nome, coluna)
+        armazem.livres = estado["livres"]
+        return armazem
+
+    # Entregas, makespan (desde "inicio") e latências ordenadas das encomendas entregues, em uma passada pelas colunas
+    def resumo(self, inicio):
+        if np is not None:
+            descarregado = np.frombuffer(self.horario_descarregado, dtype=np.float64)
+            entregue = ~np.isnan(descarregado)
+            latencias = np.sort(descarregado[entregue] - np.frombuffer(self.horario_criacao, dtype=np.float64)[entregue])
+            makespan = float(descarregado[entregue].max()) - inicio if latencias.size else 0.0
+            return int(latencias.size), makespan, latencias.tolist()
+        latencias = sorted(d - c for d, c in zip(self.horario_descarregado, self.horario_criacao) if d == d)  # NaN != NaN
+        entregues = [d for d in self.horario_descarregado if d == d]
+        return len(latencias), (max(entregues) - inicio if entregues else 0.0), latencias
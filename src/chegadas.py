@@ -0,0 +1,112 @@
+# Processos de chegada de encomendas para o sistema aberto (encomendas chegando ao longo do tempo)
+# Cada processo é um iterável preguiçoso de (tempo, origem, destino), com o tempo em segundos
+# desde o início da simulação e em ordem crescente. Nada é gerado antes da hora, então
+# a memória não cresce com a duração da execução.
+# Cada processo guarda onde está (estado/restaurar), para um instantâneo continuar a sequência de onde parou.
+import csv
+import json
+
+# Sorteia origem e destino diferentes
+def sortear_par(rng, numero_pontos):
+    origem = rng.randrange(numero_pontos)
+    destino = rng.randrange(numero_pontos - 1)
+    return origem, destino + (destino >= origem)
+
+# Chegadas de Poisson: intervalos exponenciais com média 1/taxa
+class ProcessoPoisson:
+    def __init__(self, taxa, numero_pontos, rng):
+        if taxa <= 0:
+            raise ValueError("A taxa de chegadas deve ser positiva.")
+        self.taxa = taxa  # Encomendas por segundo
+        self.numero_pontos = numero_pontos
+        self.rng = rng
+        self.tempo = 0.0  # Instante da última chegada gerada
+
+    def estado(self):
+        return {"tempo": self.tempo, "rng": self.rng.getstate()}
+
+    def restaurar(self, estado):
+        self.tempo = estado["tempo"]
+        self.rng.setstate(estado["rng"])
+
+    def __iter__(self):
+        while True:
+            self.tempo += self.rng.expovariate(self.taxa)
+            yield (self.tempo, *sortear_par(self.rng, self.numero_pontos))
+
+# Chegadas em rajadas: a cada "periodo" segundos há uma rajada de "duracao_rajada" segundos com
+# taxa "taxa_rajada"; no resto do tempo a taxa é "taxa". Gerado por afinamento (thinning) de um
+# processo de Poisson com a maior das duas taxas.
+class ProcessoRajadas:
+    def __init__(self, taxa, taxa_rajada, duracao_rajada, periodo, numero_pontos, rng):
+        if taxa < 0 or taxa_rajada <= 0 or not 0 < duracao_rajada <= periodo:
+            raise ValueError("Parâmetros de rajada inválidos: use taxa >= 0, taxa_rajada > 0 e 0 < duracao_rajada <= periodo.")
+        self.taxa = taxa
+        self.taxa_rajada = taxa_rajada
+        self.duracao_rajada = duracao_rajada
+        self.periodo = periodo
+        self.numero_pontos = numero_pontos
+        self.rng = rng
+        self.tempo = 0.0  # Instante do último candidato sorteado
+
+    def estado(self):
+        return {"tempo": self.tempo, "rng": self.rng.getstate()}
+
+    def restaurar(self, estado):
+        self.tempo = estado["tempo"]
+        self.rng.setstate(estado["rng"])
+
+    def taxa_em(self, tempo):
+        return self.taxa_rajada if tempo % self.periodo < self.duracao_rajada else self.taxa
+
+    def __iter__(self):
+        taxa_maxima = max(self.taxa, self.taxa_rajada)
+        while True:
+            self.tempo += self.rng.expovariate(taxa_maxima)
+            if self.rng.random() * taxa_maxima < self.taxa_em(self.tempo):
+                yield (self.tempo, *sortear_par(self.rng, self.numero_pontos))
+
+# Chegadas lidas de um registro de pedidos, linha a linha
+#   CSV com cabeçalho:  tempo,origem,destino
+#   JSON Lines:         {"tempo": 1.5, "origem": 0, "destino": 3}
+class ProcessoArquivo:
+    def __init__(self, caminho, numero_pontos):
+        self.caminho = caminho
+        self.numero_pontos = numero_pontos
+        self.lidos = 0  # Pedidos já entregues ao injetor (ao retomar, são pulados)
+
+    def estado(self):
+        return {"lidos": self.lidos}
+
+    def restaurar(self, estado):
+        self.lidos = estado["lidos"]
+
+    def __iter__(self):
+        with open(self.caminho, newline="") as arquivo:
+            if self.caminho.endswith(".jsonl"):
+                linhas = (json.loads(linha) for linha in arquivo if linha.strip())
+            else:
+                linhas = csv.DictReader(arquivo)
+            anterior = 0.0
+            for numero, linha in enumerate(linhas, 1):
+                tempo, origem, destino = float(linha["tempo"]), int(linha["origem"]), int(linha["destino"])
+                if tempo < anterior:
+                    raise ValueError(f"{self.caminho}, pedido {numero}: os tempos devem estar em ordem crescente.")
+                if not (0 <= origem < self.numero_pontos and 0 <= destino < self.numero_pontos) or origem == destino:
+                    raise ValueError(f"{self.caminho}, pedido {numero}: origem e destino devem ser pontos diferentes entre 0 e {self.numero_pontos - 1}.")
+                anterior = tempo
+                if numero <= self.lidos:
+                    continue
+                self.lidos = numero
+                yield tempo, origem, destino
+
+# Cria o processo de chegadas descrito na configuração
+# config["chegadas"]: "poisson", "rajadas" ou caminho de um registro de pedidos (.csv/.jsonl)
+def criar_processo_chegadas(config, numero_pontos, rng):
+    tipo = config["chegadas"]
+    if tipo == "poisson":
+        return ProcessoPoisson(config.get("taxa_chegadas", 1.0), numero_pontos, rng)
+    if tipo == "rajadas":
+        return ProcessoRajadas(config.get("taxa_chegadas", 1.0), config.get("taxa_rajada", 10.0),
+                               config.get("duracao_rajada", 10.0), config.get("periodo_rajada", 60.0), numero_pontos, rng)
+    return ProcessoArquivo(tipo, numero_pontos)
@@ -0,0 +1,50 @@
+# Histórico compacto das ações de um veículo
+# Cada ação ocupa 12 bytes em dois arrays tipados: a encomenda (com a ação no bit mais baixo) e o ponto.
+# O texto ("Carregou encomenda 7 no ponto 3") só é montado por linhas(), quando uma interface exibe o histórico.
+# Com "maximo" só as últimas ações são mantidas (sistema aberto): os arrays crescem até o dobro do máximo
+# e a metade mais antiga é descartada de uma vez, então cada ação custa O(1) amortizado.
+from array import array
+from instantaneos import Prefixo
+
+CARREGOU, ENTREGOU = 0, 1
+VERBOS = ("Carregou", "Entregou")
+
+class HistoricoVeiculo:
+    def __init__(self, maximo=None):
+        self.maximo = maximo  # None = guarda todas as ações
+        self.encomendas = array("q")  # ID da encomenda << 1 | ação
+        self.pontos = array("i")
+
+    def registrar(self, acao, encomenda_id, ponto):
+        self.encomendas.append(encomenda_id << 1 | acao)
+        self.pontos.append(ponto)
+        if self.maximo is not None and len(self.pontos) >= 2 * self.maximo:
+            descartar = len(self.pontos) - self.maximo
+            del self.encomendas[:descartar]
+            del self.pontos[:descartar]
+
+    def __len__(self):
+        return len(self.pontos) if self.maximo is None else min(len(self.pontos), self.maximo)
+
+    def __iter__(self): # Tuplas (ação, encomenda, ponto), da mais antiga para a mais recente
+        inicio = len(self.pontos) - len(self)
+        for codigo, ponto in zip(self.encomendas[inicio:], self.pontos[inicio:]):
+            yield codigo & 1, codigo >> 1, ponto
+
+    def linhas(self): # Texto de cada ação, montado só na hora de exibir
+        for acao, encomenda_id, ponto in self:
+            yield f"{VERBOS[acao]} encomenda {encomenda_id} no ponto {ponto}"
+
+    # Cópia para um instantâneo: sem máximo os arrays só crescem e nem são copiados (ver instantaneos.Prefixo)
+    def estado(self):
+        if self.maximo is None:
+            return {"maximo": None, "encomendas": Prefixo(self.encomendas), "pontos": Prefixo(self.pontos)}
+        inicio = len(self.pontos) - len(self)
+        return {"maximo": self.maximo, "encomendas": self.encomendas[inicio:], "pontos": self.pontos[inicio:]}
+
+    @classmethod
+    def restaurar(cls, estado):
+        historico = cls(estado["maximo"])
+        historico.encomendas = estado["encomendas"]
+        historico.pontos = estado["pontos"]
+        return historico
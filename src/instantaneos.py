@@ -0,0 +1,100 @@
+# Instantâneos (checkpoints) do estado de uma execução em andamento
+# O estado é capturado com a simulação parada (ver Instantaneos em simulacao_logistica.py), mas a captura só
+# copia colunas e listas; serializar (pickle), comprimir (zlib) e gravar fica com um thread separado, então
+# os veículos não esperam pelo disco. O arquivo é gravado em um temporário e renomeado (os.replace), então
+# sempre há um instantâneo completo no caminho, mesmo que o processo morra no meio de uma gravação.
+# Formato: MARCADOR seguido do pickle comprimido de um dicionário com "versao" = VERSAO.
+# Como todo pickle, só carregue instantâneos de origem confiável.
+import os
+import pickle
+import threading
+import zlib
+from array import array
+
+MARCADOR = b"INST"
+VERSAO = 2
+
+def salvar_instantaneo(caminho, estado):
+    dados = MARCADOR + zlib.compress(pickle.dumps(estado, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(dados)
+    os.replace(temporario, caminho)
+    return len(dados)
+
+def carregar_instantaneo(caminho):
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+    if not dados.startswith(MARCADOR):
+        raise ValueError(f"Arquivo de instantâneo inválido: {caminho}")
+    estado = pickle.loads(zlib.decompress(dados[len(MARCADOR):]))
+    if estado.get("versao") != VERSAO:
+        raise ValueError(f"Versão de instantâneo não suportada: {estado.get('versao')}")
+    return estado
+
+# Lista ou array que só cresce no fim (histórico dos veículos, amostras de fila sem limite, colunas fixas do armazém)
+# Copiá-la durante a pausa custaria uma passada por todos os itens; em vez disso o instantâneo guarda a própria
+# sequência e o tamanho naquele momento, e o trecho só é copiado ao serializar, no thread de gravação. Como os
+# itens já existentes nunca mudam, o resultado é o mesmo da cópia, e no arquivo o Prefixo vira uma lista ou array comum.
+class Prefixo:
+    __slots__ = ("lista", "tamanho")
+
+    def __init__(self, lista):
+        self.lista = lista
+        self.tamanho = len(lista)
+
+    def __reduce__(self):
+        trecho = self.lista[:self.tamanho]
+        if isinstance(trecho, array):
+            return array, (trecho.typecode, trecho.tobytes())
+        return list, (trecho,)
+
+# Grava os instantâneos em um thread separado
+# Só o mais recente importa: se um novo chega enquanto o anterior ainda espera a gravação, o anterior é descartado.
+# Quem captura pode consultar ocupado() e nem capturar enquanto uma gravação está em andamento.
+class GravadorInstantaneos:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.condicao = threading.Condition()
+        self.pendente = None  # Estado aguardando gravação
+        self.encerrar = False
+        self.gravando = False
+        self.gravados = 0
+        self.bytes_ultimo = 0  # Tamanho do último arquivo gravado
+        self.erro = None  # Exceção ocorrida no thread de gravação, relançada em fechar()
+        self.thread = threading.Thread(target=self.run, name="GravadorInstantaneos", daemon=True)
+        self.thread.start()
+
+    def enviar(self, estado): # Chamado com o estado já copiado; apenas o entrega ao thread de gravação
+        with self.condicao:
+            self.pendente = estado
+            self.condicao.notify()
+
+    def ocupado(self): # Há um instantâneo esperando ou sendo gravado
+        return self.pendente is not None or self.gravando
+
+    def fechar(self): # Grava o pendente e espera o thread terminar
+        with self.condicao:
+            self.encerrar = True
+            self.condicao.notify()
+        self.thread.join()
+        if self.erro is not None:
+            raise self.erro
+
+    def run(self):
+        while True:
+            with self.condicao:
+                while self.pendente is None and not self.encerrar:
+                    self.condicao.wait()
+                estado = self.pendente
+                if estado is None:
+                    return
+                self.gravando = True  # Antes de esvaziar pendente, para ocupado() não ver um intervalo livre
+                self.pendente = None
+            try:
+                self.bytes_ultimo = salvar_instantaneo(self.caminho, estado)
+                self.gravados += 1
+            except Exception as e:  # Guarda o erro e continua: o próximo instantâneo pode dar certo
+                self.erro = e
+            finally:
+                self.gravando = False
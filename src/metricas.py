@@ -0,0 +1,321 @@
+# Métricas da simulação: contadores, histogramas e séries de fila por ponto
+# Tudo é acumulado em memória com custo constante por evento (um bisect por observação)
+# e pode ser exportado em texto no formato do Prometheus ou em CSV.
+import bisect
+import copy
+import csv
+import random
+import threading
+import time
+from collections import deque
+from instantaneos import Prefixo
+
+# Limites dos histogramas (segundos). O último balde (+Inf) é implícito.
+BALDES_TEMPO = [0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600]
+BALDES_LOCK = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1]
+
+class Histograma:
+    def __init__(self, baldes):
+        self.baldes = list(baldes)
+        self.contagens = [0] * (len(self.baldes) + 1)  # Contagem por balde (não acumulada); a última posição é +Inf
+        self.soma = 0.0
+        self.quantidade = 0
+        self.maximo = None
+
+    def observar(self, valor, vezes=1):
+        self.contagens[bisect.bisect_left(self.baldes, valor)] += vezes
+        self.soma += valor * vezes
+        self.quantidade += vezes
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+
+    def somar(self, outro): # Acumula as observações de outro histograma com os mesmos baldes
+        self.contagens = [a + b for a, b in zip(self.contagens, outro.contagens)]
+        self.soma += outro.soma
+        self.quantidade += outro.quantidade
+        if outro.maximo is not None and (self.maximo is None or outro.maximo > self.maximo):
+            self.maximo = outro.maximo
+
+    def media(self):
+        return self.soma / self.quantidade if self.quantidade else 0.0
+
+    def acumulado(self): # Pares (limite, contagem acumulada) como no Prometheus
+        total = 0
+        for limite, contagem in zip(self.baldes + [float("inf")], self.contagens):
+            total += contagem
+            yield limite, total
+
+# Vazão e latência das entregas dos últimos "largura" segundos
+# Guarda só as entregas dentro da janela, então a memória é limitada por taxa x largura.
+class JanelaDeslizante:
+    def __init__(self, largura):
+        self.largura = largura
+        self.entregas = deque()  # (horário da entrega, latência), em ordem de entrega
+
+    def registrar(self, horario, latencia):
+        self.entregas.append((horario, latencia))
+        self.podar(horario)
+
+    def podar(self, agora):
+        limite = agora - self.largura
+        while self.entregas and self.entregas[0][0] < limite:
+            self.entregas.popleft()
+
+    def resumo(self, agora):
+        self.podar(agora)
+        latencias = sorted(latencia for _, latencia in self.entregas)
+        return {
+            "entregas": len(latencias),
+            "vazao": len(latencias) / self.largura,  # Entregas por segundo
+            "latencia_media": sum(latencias) / len(latencias) if latencias else None,
+            "latencia_p95": latencias[max(0, int(round(0.95 * len(latencias))) - 1)] if latencias else None,
+        }
+
+# Amostra uniforme de tamanho fixo de um fluxo sem fim (algoritmo R), para estimar percentis com memória limitada
+class Reservatorio:
+    def __init__(self, tamanho, rng=None):
+        self.tamanho = tamanho
+        self.vistos = 0
+        self.valores = []
+        self.rng = rng or random.Random(0)
+
+    def adicionar(self, valor):
+        self.vistos += 1
+        if len(self.valores) < self.tamanho:
+            self.valores.append(valor)
+        else:
+            indice = self.rng.randrange(self.vistos)
+            if indice < self.tamanho:
+                self.valores[indice] = valor
+
+# Tamanho de uma fila ao longo do tempo: média ponderada pelo tempo, máximo e amostras espaçadas
+class SerieFila:
+    def __init__(self, inicio, intervalo_amostras, max_amostras=None):
+        self.intervalo_amostras = intervalo_amostras  # Espaçamento mínimo entre amostras guardadas (limita a memória)
+        self.ultimo_tempo = inicio
+        self.ultimo_valor = 0
+        self.area = 0.0  # Integral do tamanho da fila no tempo
+        self.maximo = 0
+        self.amostras = deque(maxlen=max_amostras) if max_amostras else []  # (tempo, tamanho); com max_amostras, só as mais recentes
+
+    def registrar(self, tempo, valor):
+        self.area += self.ultimo_valor * max(0.0, tempo - self.ultimo_tempo)
+        self.ultimo_tempo, self.ultimo_valor = tempo, valor
+        self.maximo = max(self.maximo, valor)
+        if not self.amostras or tempo - self.amostras[-1][0] >= self.intervalo_amostras:
+            self.amostras.append((tempo, valor))
+
+# Cópia de um objeto de métrica para um instantâneo: as coleções (listas, deques, dicionários) são copiadas
+# rasas, já que os valores são números e tuplas imutáveis. As amostras sem limite de uma SerieFila só crescem
+# no fim, então nem são copiadas (ver instantaneos.Prefixo).
+def copiar_estado(objeto):
+    copia = copy.copy(objeto)
+    for nome, valor in vars(copia).items():
+        if isinstance(objeto, SerieFila) and nome == "amostras" and isinstance(valor, list):
+            copia.amostras = Prefixo(valor)
+        elif isinstance(valor, (list, deque, dict, random.Random)):
+            setattr(copia, nome, copy.copy(valor))
+    return copia
+
+# Lock que mede quanto tempo cada thread esperou para adquiri-lo
+# Os contadores são do próprio LockMedido e só mudam com o lock já adquirido, então é o lock medido que os
+# protege: medir não acrescenta nenhum lock global. As Metricas juntam os contadores de todos ao exportar.
+class LockMedido:
+    def __init__(self, lock, nome):
+        self.lock = lock
+        self.nome = nome
+        self.sem_espera = 0  # Aquisições sem disputa (espera zero)
+        self.esperas = Histograma(BALDES_LOCK)  # Aquisições que precisaram esperar (segundos, tempo real)
+
+    def acquire(self):
+        if self.lock.acquire(blocking=False):  # Caminho sem disputa: só um contador, sem relógio
+            self.sem_espera += 1
+            return True
+        inicio = time.perf_counter()
+        self.lock.acquire()
+        self.esperas.observar(time.perf_counter() - inicio)
+        return True
+
+    __enter__ = acquire  # Sem uma chamada a mais por aquisição
+
+    def release(self):
+        self.lock.release()
+
+    def __exit__(self, *exc):
+        self.lock.release()
+
+class Metricas:
+    TAMANHO_RESERVATORIO = 10000  # Latências guardadas para estimar percentis em execuções sem fim
+
+    def __init__(self, inicio=0.0, intervalo_amostras=1.0, max_amostras=None, largura_janela=None):
+        self.inicio = inicio  # Horário (do relógio da simulação) em que a execução começou
+        self.fim = None
+        self.intervalo_amostras = intervalo_amostras
+        self.max_amostras = max_amostras  # Limite de amostras guardadas por fila (None = sem limite)
+        self.janela = JanelaDeslizante(largura_janela) if largura_janela else None  # Vazão/latência recentes
+        self.latencia = Histograma(BALDES_TEMPO)  # Criação -> entrega
+        self.amostra_latencias = Reservatorio(self.TAMANHO_RESERVATORIO)
+        self.ultima_entrega = None  # Horário da entrega mais recente
+        self.lock = threading.Lock()  # Os veículos podem registrar de threads diferentes
+        self.espera = Histograma(BALDES_TEMPO)  # Criação -> carregamento
+        self.transito = Histograma(BALDES_TEMPO)  # Carregamento -> descarregamento
+        self.espera_lock = {}  # nome do lock -> Histograma (segundos de espera, tempo real) acumulado antes de uma retomada
+        self.locks_medidos = []  # LockMedido criados por medir_lock (os contadores ficam neles)
+        self.cargas_veiculo = {}  # id do veículo -> encomendas carregadas
+        self.entregas_veiculo = {}  # id do veículo -> encomendas entregues
+        self.utilizacao_veiculo = {}  # id do veículo -> ocupação média da capacidade (preenchido em finalizar)
+        self.filas = {}  # id do ponto -> SerieFila
+        self.docas_ocupadas = {}  # id do ponto -> paradas em que todas as docas estavam ocupadas
+        self.pausa_instantaneo = Histograma(BALDES_LOCK)  # Tempo real em que a simulação ficou parada para cada instantâneo
+
+    def medir_lock(self, lock, nome): # Envolve um lock para medir a espera por ele
+        medido = LockMedido(lock, nome)
+        self.locks_medidos.append(medido)
+        return medido
+
+    def esperas_lock(self): # nome do lock -> Histograma com as esperas de todos os locks medidos com esse nome
+        esperas = {nome: copy.deepcopy(histograma) for nome, histograma in self.espera_lock.items()}
+        for medido in self.locks_medidos:
+            histograma = esperas.setdefault(medido.nome, Histograma(BALDES_LOCK))
+            histograma.somar(medido.esperas)
+            if medido.sem_espera:
+                histograma.observar(0.0, medido.sem_espera)
+        return esperas
+
+    def registrar_carga(self, veiculo_id, horario_criacao, horario_carregado):
+        with self.lock:
+            self.espera.observar(horario_carregado - horario_criacao)
+            self.cargas_veiculo[veiculo_id] = self.cargas_veiculo.get(veiculo_id, 0) + 1
+
+    def registrar_entrega(self, veiculo_id, horario_criacao, horario_carregado, horario_descarregado):
+        with self.lock:
+            self.transito.observar(horario_descarregado - horario_carregado)
+            self.entregas_veiculo[veiculo_id] = self.entregas_veiculo.get(veiculo_id, 0) + 1
+            latencia = horario_descarregado - horario_criacao
+            self.latencia.observar(latencia)
+            self.amostra_latencias.adicionar(latencia)
+            self.ultima_entrega = horario_descarregado
+            if self.janela is not None:
+                self.janela.registrar(horario_descarregado, latencia)
+
+    def resumo_janela(self, agora): # Vazão e latência da janela deslizante no instante "agora"
+        with self.lock:
+            return self.janela.resumo(agora)
+
+    def registrar_doca_ocupada(self, ponto_id):
+        with self.lock:
+            self.docas_ocupadas[ponto_id] = self.docas_ocupadas.get(ponto_id, 0) + 1
+
+    def registrar_pausa_instantaneo(self, segundos):
+        with self.lock:
+            self.pausa_instantaneo.observar(segundos)
+
+    def estado(self): # Cópia de tudo o que foi acumulado (sem os locks), para um instantâneo
+        with self.lock:
+            estado = {nome: copiar_estado(valor) if hasattr(valor, "__dict__") else copy.copy(valor)
+                      for nome, valor in vars(self).items() if nome not in ("lock", "locks_medidos")}
+            estado["filas"] = {chave: copiar_estado(valor) for chave, valor in estado["filas"].items()}
+            estado["espera_lock"] = self.esperas_lock()
+            return estado
+
+    def restaurar(self, estado): # Continua a acumular a partir de um instantâneo
+        with self.lock:
+            vars(self).update(estado)
+
+    def registrar_fila(self, ponto_id, tempo, tamanho):
+        with self.lock:
+            serie = self.filas.get(ponto_id)
+            if serie is None:
+                serie = self.filas[ponto_id] = SerieFila(self.inicio, self.intervalo_amostras, self.max_amostras)
+            serie.registrar(tempo, tamanho)
+
+    def finalizar(self, fim, veiculos): # Fecha as séries de fila e calcula a utilização de cada veículo
+        self.fim = fim
+        duracao = fim - self.inicio
+        for ponto_id, serie in self.filas.items():
+            self.registrar_fila(ponto_id, fim, serie.ultimo_valor)
+        for veiculo in veiculos:
+            self.utilizacao_veiculo[veiculo.id] = veiculo.carga_tempo / (veiculo.capacidade * duracao) if duracao > 0 else 0.0
+
+    def fila_media(self, ponto_id):
+        serie = self.filas[ponto_id]
+        duracao = serie.ultimo_tempo - self.inicio
+        return serie.area / duracao if duracao > 0 else float(serie.ultimo_valor)
+
+    # Linhas (métrica, rótulos, valor) comuns às duas exportações
+    def linhas(self):
+        for nome, histograma in (("simulacao_espera_segundos", self.espera), ("simulacao_transito_segundos", self.transito),
+                                 ("simulacao_latencia_segundos", self.latencia)):
+            yield from self._linhas_histograma(nome, {}, histograma)
+        for nome_lock, histograma in sorted(self.esperas_lock().items()):
+            yield from self._linhas_histograma("simulacao_lock_espera_segundos", {"lock": nome_lock}, histograma)
+        for veiculo_id in sorted(self.cargas_veiculo.keys() | self.utilizacao_veiculo.keys()):
+            rotulos = {"veiculo": veiculo_id}
+            yield "simulacao_veiculo_cargas_total", rotulos, self.cargas_veiculo.get(veiculo_id, 0)
+            yield "simulacao_veiculo_entregas_total", rotulos, self.entregas_veiculo.get(veiculo_id, 0)
+            if veiculo_id in self.utilizacao_veiculo:
+                yield "simulacao_veiculo_utilizacao", rotulos, self.utilizacao_veiculo[veiculo_id]
+        for ponto_id in sorted(self.filas):
+            rotulos = {"ponto": ponto_id}
+            yield "simulacao_ponto_fila", rotulos, self.filas[ponto_id].ultimo_valor
+            yield "simulacao_ponto_fila_media", rotulos, self.fila_media(ponto_id)
+            yield "simulacao_ponto_fila_maxima", rotulos, self.filas[ponto_id].maximo
+        for ponto_id in sorted(self.docas_ocupadas):
+            yield "simulacao_ponto_docas_ocupadas_total", {"ponto": ponto_id}, self.docas_ocupadas[ponto_id]
+        if self.pausa_instantaneo.quantidade:
+            yield from self._linhas_histograma("simulacao_instantaneo_pausa_segundos", {}, self.pausa_instantaneo)
+
+    @staticmethod
+    def _linhas_histograma(nome, rotulos, histograma):
+        for limite, total in histograma.acumulado():
+            yield f"{nome}_bucket", dict(rotulos, le="+Inf" if limite == float("inf") else repr(limite)), total
+        yield f"{nome}_sum", rotulos, histograma.soma
+        yield f"{nome}_count", rotulos, histograma.quantidade
+
+    TIPOS = {
+        "simulacao_espera_segundos": ("histogram", "Tempo da criação da encomenda até o carregamento"),
+        "simulacao_transito_segundos": ("histogram", "Tempo do carregamento até a entrega"),
+        "simulacao_latencia_segundos": ("histogram", "Tempo da criação da encomenda até a entrega"),
+        "simulacao_lock_espera_segundos": ("histogram", "Tempo real de espera para adquirir os locks da simulação"),
+        "simulacao_veiculo_cargas_total": ("counter", "Encomendas carregadas por veículo"),
+        "simulacao_veiculo_entregas_total": ("counter", "Encomendas entregues por veículo"),
+        "simulacao_veiculo_utilizacao": ("gauge", "Ocupação média da capacidade do veículo (0 a 1)"),
+        "simulacao_ponto_fila": ("gauge", "Encomendas na fila do ponto"),
+        "simulacao_ponto_fila_media": ("gauge", "Tamanho médio da fila do ponto, ponderado pelo tempo"),
+        "simulacao_ponto_fila_maxima": ("gauge", "Maior tamanho de fila observado no ponto"),
+        "simulacao_ponto_docas_ocupadas_total": ("counter", "Paradas em que o veículo encontrou todas as docas do ponto ocupadas"),
+        "simulacao_instantaneo_pausa_segundos": ("histogram", "Tempo real em que a simulação ficou parada para capturar cada instantâneo"),
+    }
+
+    def para_prometheus(self): # Texto no formato de exposição do Prometheus
+        saida = []
+        anunciadas = set()
+        for nome, rotulos, valor in self.linhas():
+            base = nome if nome in self.TIPOS else nome.rsplit("_", 1)[0]  # Tira _bucket/_sum/_count dos histogramas
+            if base not in anunciadas:
+                tipo, ajuda = self.TIPOS[base]
+                saida.append(f"# HELP {base} {ajuda}")
+                saida.append(f"# TYPE {base} {tipo}")
+                anunciadas.add(base)
+            texto_rotulos = ",".join(f'{chave}="{valor_rotulo}"' for chave, valor_rotulo in rotulos.items())
+            saida.append(f"{nome}{{{texto_rotulos}}} {valor}" if texto_rotulos else f"{nome} {valor}")
+        return "\n".join(saida) + "\n"
+
+    def salvar_prometheus(self, caminho):
+        with open(caminho, "w") as arquivo:
+            arquivo.write(self.para_prometheus())
+
+    def salvar_csv(self, caminho): # Uma linha por valor: metrica, rotulos (chave=valor;...), valor
+        with open(caminho, "w", newline="") as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(["metrica", "rotulos", "valor"])
+            for nome, rotulos, valor in self.linhas():
+                escritor.writerow([nome, ";".join(f"{chave}={v}" for chave, v in rotulos.items()), valor])
+
+    def salvar_series_csv(self, caminho): # Amostras do tamanho das filas: ponto, tempo (desde o início), tamanho
+        with open(caminho, "w", newline="") as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(["ponto", "tempo", "tamanho"])
+            for ponto_id in sorted(self.filas):
+                for tempo, tamanho in self.filas[ponto_id].amostras:
+                    escritor.writerow([ponto_id, round(tempo - self.inicio, 6), tamanho])
@@ -0,0 +1,164 @@
+# Gravação dos rastros das encomendas
+# As encomendas entregues são enviadas para uma fila e um thread de escrita grava em lotes,
+# então nenhum veículo ou encomenda espera pelo disco. Formatos disponíveis:
+#   "texto"   - um arquivo encomenda_{id}.txt por encomenda (formato original)
+#   "jsonl"   - um único arquivo rastros.jsonl, uma encomenda por linha
+#   "csv"     - um único arquivo rastros.csv
+#   "binario" - um único arquivo rastros.bin em blocos colunares (ver EscritorRastros.escrever_binario)
+import argparse
+import csv
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+
+# Campos de cada registro de rastro, na ordem em que são gravados
+CAMPOS = ["id", "origem", "destino", "horario_criacao", "horario_carregado", "horario_descarregado", "veiculo_id"]
+
+# Tipos das colunas no formato binário (códigos do módulo array)
+TIPOS_BINARIO = ["q", "i", "i", "d", "d", "d", "i"]
+CABECALHO_BLOCO = struct.Struct("<4sI")  # Marcador do bloco e quantidade de registros
+MARCADOR_BLOCO = b"RST1"
+
+FORMATOS = ["texto", "jsonl", "csv", "binario"]
+ARQUIVOS = {"jsonl": "rastros.jsonl", "csv": "rastros.csv", "binario": "rastros.bin"}
+
+# Texto do arquivo de rastro individual (mesmo conteúdo que o rastro por encomenda sempre teve)
+def formatar_texto(registro):
+    id, origem, destino, criacao, carregado, descarregado, veiculo_id = registro
+    return (
+        f"Encomenda ID: {id}\n"
+        f"Origem: {origem}\n"
+        f"Destino: {destino}\n"
+        f"Horário de Chegada ao Ponto de Origem: {time.strftime('%H:%M:%S', time.localtime(criacao))}\n"  # Assumindo que chegou ao ponto ao ser criada
+        f"Horário de Carregamento no Veículo: {time.strftime('%H:%M:%S', time.localtime(carregado))}\n"
+        f"ID do Veículo: {veiculo_id}\n"
+        f"Horário de Descarregamento no Destino: {time.strftime('%H:%M:%S', time.localtime(descarregado))}\n"
+    )
+
+def escrever_texto(diretorio, registro):
+    with open(os.path.join(diretorio, f"encomenda_{registro[0]}.txt"), "w") as arquivo:
+        arquivo.write(formatar_texto(registro))
+
+class EscritorRastros:
+    def __init__(self, diretorio, formato="texto", tamanho_lote=4096):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de rastro desconhecido: {formato}")
+        self.diretorio = diretorio  # Pasta de saída
+        self.formato = formato  # Um dos FORMATOS
+        self.tamanho_lote = tamanho_lote  # Máximo de registros gravados de uma vez
+        self.fila = queue.Queue()  # Registros aguardando gravação (None sinaliza o fim)
+        self.erro = None  # Exceção ocorrida no thread de escrita, relançada em fechar()
+        self.registros_gravados = 0
+        self.caminho = os.path.join(diretorio, ARQUIVOS[formato]) if formato in ARQUIVOS else diretorio
+        self.arquivo = None
+        if formato in ARQUIVOS:
+            self.arquivo = open(self.caminho, "ab") if formato == "binario" else open(self.caminho, "a", newline="")
+            if formato == "csv" and self.arquivo.tell() == 0:
+                csv.writer(self.arquivo).writerow(CAMPOS)
+        self.thread = threading.Thread(target=self.run, name="EscritorRastros", daemon=True)
+        self.thread.start()
+
+    def registrar(self, registro): # Chamado quando a encomenda é entregue, com a tupla na ordem de CAMPOS; apenas enfileira
+        self.fila.put(registro)
+
+    def fechar(self): # Grava o que falta, fecha o arquivo e espera o thread de escrita terminar
+        self.fila.put(None)
+        self.thread.join()
+        if self.arquivo is not None:
+            self.arquivo.close()
+        if self.erro is not None:
+            raise self.erro
+
+    def run(self):
+        terminou = False
+        while not terminou:
+            # Bloqueia até haver algo e depois junta tudo o que já estiver na fila, até o tamanho do lote
+            lote = [self.fila.get()]
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+            if lote[-1] is None:
+                terminou = True
+                lote.pop()
+            if lote and self.erro is None:
+                try:
+                    self.escrever(lote)
+                    self.registros_gravados += len(lote)
+                except Exception as e:  # Guarda o erro para não matar o thread com registros ainda na fila
+                    self.erro = e
+
+    def escrever(self, lote):
+        if self.formato == "texto":
+            for registro in lote:
+                escrever_texto(self.diretorio, registro)
+        elif self.formato == "jsonl":
+            self.arquivo.write("".join(json.dumps(dict(zip(CAMPOS, registro))) + "\n" for registro in lote))
+        elif self.formato == "csv":
+            csv.writer(self.arquivo).writerows(lote)
+        else:
+            self.escrever_binario(lote)
+        if self.arquivo is not None:
+            self.arquivo.flush()
+
+    def escrever_binario(self, lote):
+        # Cada lote vira um bloco: cabeçalho (marcador, quantidade) seguido de uma coluna por campo,
+        # em little-endian. Veículo ausente é gravado como -1.
+        self.arquivo.write(CABECALHO_BLOCO.pack(MARCADOR_BLOCO, len(lote)))
+        for indice, tipo in enumerate(TIPOS_BINARIO):
+            coluna = array(tipo, (-1 if registro[indice] is None else registro[indice] for registro in lote))
+            if sys.byteorder == "big":
+                coluna.byteswap()
+            self.arquivo.write(coluna.tobytes())
+
+# Lê um arquivo de rastros (jsonl, csv ou binario) e devolve os registros como tuplas na ordem de CAMPOS
+def ler_rastros(caminho):
+    if caminho.endswith(".jsonl"):
+        with open(caminho) as arquivo:
+            return [tuple(json.loads(linha)[campo] for campo in CAMPOS) for linha in arquivo if linha.strip()]
+    if caminho.endswith(".csv"):
+        with open(caminho, newline="") as arquivo:
+            leitor = csv.reader(arquivo)
+            next(leitor)
+            conversores = [int, int, int, float, float, float, lambda v: int(v) if v else None]
+            return [tuple(f(v) for f, v in zip(conversores, linha)) for linha in leitor]
+    registros = []
+    with open(caminho, "rb") as arquivo:
+        while True:
+            cabecalho = arquivo.read(CABECALHO_BLOCO.size)
+            if not cabecalho:
+                break
+            marcador, quantidade = CABECALHO_BLOCO.unpack(cabecalho)
+            if marcador != MARCADOR_BLOCO:
+                raise ValueError(f"Arquivo de rastros binário inválido: {caminho}")
+            colunas = []
+            for tipo in TIPOS_BINARIO:
+                coluna = array(tipo)
+                coluna.frombytes(arquivo.read(coluna.itemsize * quantidade))
+                if sys.byteorder == "big":
+                    coluna.byteswap()
+                colunas.append(coluna)
+            registros.extend(zip(*colunas))
+    return [registro[:-1] + (None if registro[-1] == -1 else registro[-1],) for registro in registros]
+
+# Recria os arquivos encomenda_{id}.txt a partir de um arquivo de rastros
+def exportar_texto(caminho, diretorio):
+    os.makedirs(diretorio, exist_ok=True)
+    registros = ler_rastros(caminho)
+    for registro in registros:
+        escrever_texto(diretorio, registro)
+    return len(registros)
+
+# Linha de comando: python rastros.py rastros/rastros.bin rastros_txt
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recria os arquivos de rastro por encomenda a partir de um arquivo jsonl, csv ou binário.")
+    parser.add_argument("arquivo", help="Arquivo de rastros (.jsonl, .csv ou .bin)")
+    parser.add_argument("diretorio", help="Pasta onde os arquivos encomenda_{id}.txt serão criados")
+    args = parser.parse_args()
+    print(f"{exportar_texto(args.arquivo, args.diretorio)} arquivos de rastro exportados para {args.diretorio}")
@@ -0,0 +1,54 @@
+# Registro de eventos de uma execução, para reprodução exata (ver reproduzir() em simulacao_logistica.py)
+# Cada linha do arquivo é uma lista JSON cujo primeiro elemento é o tipo do evento:
+#   ["inicio", config, horario]                    parâmetros da execução e horário inicial
+#   ["veiculo", id, local_inicial]
+#   ["encomenda", horario, id, origem, destino]
+#   ["carga", horario, veiculo, ponto, encomenda]
+#   ["entrega", horario, veiculo, ponto, encomenda, atraso]   atraso = tempo da descarga que terminou na entrega
+#   ["viagem", horario, veiculo, de, para, atraso]             saída do veículo em direção ao próximo ponto
+#   ["fim", horario, eventos_processados]                      eventos do SimuladorEventos (None no modo threads)
+# Os atrasos são os sorteados pelo veículo, para a reprodução somar a ocupação (carga_tempo) com os mesmos valores.
+# O lock do registro só protege a escrita de cada linha. A ordem que a reprodução precisa, a das filas dos
+# pontos, vem de quem grava: chegadas e cargas são gravadas ainda sob o fila_lock do ponto, no mesmo trecho
+# em que a encomenda entra ou sai da fila (ver Ponto.enqueue_encomenda e Ponto.retirar_lote). Os demais
+# eventos de um veículo só dependem da ordem dele mesmo. Assim a reprodução não depende do escalonamento dos threads.
+import json
+import threading
+
+class RegistroEventos:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.arquivo = open(caminho, "w")
+        self.lock = threading.Lock()
+
+    def gravar(self, *evento):
+        linha = json.dumps(evento, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.arquivo.write(linha)
+
+    def inicio(self, config, horario):
+        self.gravar("inicio", config, horario)
+
+    def veiculo(self, veiculo_id, local_inicial):
+        self.gravar("veiculo", veiculo_id, local_inicial)
+
+    def encomenda(self, horario, encomenda_id, origem, destino):
+        self.gravar("encomenda", horario, encomenda_id, origem, destino)
+
+    def carga(self, horario, veiculo_id, ponto_id, encomenda_id):
+        self.gravar("carga", horario, veiculo_id, ponto_id, encomenda_id)
+
+    def entrega(self, horario, veiculo_id, ponto_id, encomenda_id, atraso):
+        self.gravar("entrega", horario, veiculo_id, ponto_id, encomenda_id, atraso)
+
+    def viagem(self, horario, veiculo_id, de, para, atraso):
+        self.gravar("viagem", horario, veiculo_id, de, para, atraso)
+
+    def fechar(self, horario, eventos_processados=None):
+        self.gravar("fim", horario, eventos_processados)
+        self.arquivo.close()
+
+# Lê um registro de eventos gravado por RegistroEventos
+def ler_eventos(caminho):
+    with open(caminho) as arquivo:
+        return [json.loads(linha) for linha in arquivo if linha.strip()]
@@ -0,0 +1,164 @@
+# Políticas de roteamento dos veículos
+# Cada política decide, ao final de uma parada, qual é o próximo ponto do veículo.
+# Todas olham apenas para o estado público do veículo (local_atual, carga, capacidade, pontos).
+# Quando não há nada a buscar nem a entregar, todas seguem a rota cíclica.
+
+# Distância no anel 0 -> 1 -> ... -> S-1 -> 0 (quantidade de pontos entre origem e destino)
+def distancia_anel(origem, destino, total):
+    diferenca = abs(origem - destino)
+    return min(diferenca, total - diferenca)
+
+class Roteamento:
+    nome = "base"
+
+    def __init__(self, numero_pontos, distancia=None):
+        self.numero_pontos = numero_pontos
+        # Função distancia(origem, destino); sem matriz de distâncias usa a distância no anel
+        self.distancia = distancia or (lambda origem, destino: distancia_anel(origem, destino, numero_pontos))
+
+    def proximo_ponto(self, veiculo):
+        raise NotImplementedError
+
+    def estado(self): # Estado próprio da política, para os instantâneos (as políticas sem memória não têm nenhum)
+        return None
+
+    def restaurar(self, estado):
+        pass
+
+    def ciclico(self, veiculo):
+        return (veiculo.local_atual + 1) % self.numero_pontos
+
+    def alvos(self, veiculo): # Pontos que valem a visita: destinos da carga e, se houver espaço, pontos com fila
+        alvos = set(veiculo.carga.por_destino)
+        if len(veiculo.carga) < veiculo.capacidade:
+            alvos.update(ponto.id for ponto in veiculo.pontos if ponto.tamanho_fila() > 0)
+        alvos.discard(veiculo.local_atual)
+        return alvos
+
+    def mais_proximo(self, origem, candidatos): # Desempata pelo menor índice para o resultado não depender da ordem do set
+        return min(candidatos, key=lambda ponto: (self.distancia(origem, ponto), ponto))
+
+# Rota original: visita os pontos em ordem, haja ou não o que fazer neles
+class RotaCiclica(Roteamento):
+    nome = "ciclico"
+
+    def proximo_ponto(self, veiculo):
+        return self.ciclico(veiculo)
+
+# Vai ao ponto mais próximo entre os destinos da carga e os pontos com encomendas esperando
+class RotaDestinoProximo(Roteamento):
+    nome = "destino_proximo"
+
+    def proximo_ponto(self, veiculo):
+        alvos = self.alvos(veiculo)
+        if not alvos:
+            return self.ciclico(veiculo)
+        return self.mais_proximo(veiculo.local_atual, alvos)
+
+# Vai ao ponto com mais trabalho: encomendas na fila (se houver espaço) mais encomendas a entregar lá
+class RotaDemanda(Roteamento):
+    nome = "demanda"
+
+    def proximo_ponto(self, veiculo):
+        tem_espaco = len(veiculo.carga) < veiculo.capacidade
+        melhor, melhor_demanda = None, 0
+        for ponto in veiculo.pontos:
+            if ponto.id == veiculo.local_atual:
+                continue
+            demanda = len(veiculo.carga.por_destino.get(ponto.id, ()))
+            if tem_espaco:
+                demanda += ponto.tamanho_fila()
+            if demanda > melhor_demanda or (demanda == melhor_demanda and demanda > 0 and
+                                            self.distancia(veiculo.local_atual, ponto.id) < self.distancia(veiculo.local_atual, melhor)):
+                melhor, melhor_demanda = ponto.id, demanda
+        return self.ciclico(veiculo) if melhor is None else melhor
+
+# Heurística de caixeiro-viajante: monta um percurso pelos alvos (vizinho mais próximo + 2-opt) e segue esse plano
+# O plano é atualizado a cada parada em vez de refeito: alvos já atendidos saem, alvos novos entram na posição
+# que menos alonga o percurso (inserção mais barata). O plano só é refeito do zero (vizinho mais próximo) quando os
+# alvos novos são mais numerosos que os que continuam (ex.: o veículo cheio volta a ter espaço e todas as filas
+# voltam a contar). Nos dois casos o 2-opt só revê o começo do plano, que é o trecho percorrido antes da próxima
+# atualização, e por um número limitado de passadas: o custo por parada não cresce com o quadrado dos alvos.
+class RotaTSP(Roteamento):
+    nome = "tsp"
+    JANELA_2OPT = 20  # Pontos do começo do plano revistos pelo 2-opt a cada atualização
+    PASSADAS_2OPT = 2  # Máximo de passadas de 2-opt por chamada
+
+    def __init__(self, numero_pontos, distancia=None):
+        super().__init__(numero_pontos, distancia)
+        self.planos = {}  # id do veículo -> pontos ainda a visitar, em ordem
+
+    def proximo_ponto(self, veiculo):
+        alvos = self.alvos(veiculo)
+        if not alvos:
+            self.planos.pop(veiculo.id, None)
+            return self.ciclico(veiculo)
+        plano = [ponto for ponto in self.planos.get(veiculo.id, ()) if ponto in alvos]
+        novos = len(alvos) - len(plano)
+        if novos > len(plano):
+            plano = self.planejar(veiculo.local_atual, alvos)
+        elif novos:
+            percurso = [veiculo.local_atual] + plano
+            for ponto in sorted(alvos.difference(plano)):  # Em ordem, para o plano não depender da ordem do set
+                self.inserir(percurso, ponto)
+            self.melhorar_2opt(percurso, self.JANELA_2OPT)
+            plano = percurso[1:]
+        self.planos[veiculo.id] = plano[1:]
+        return plano[0]
+
+    def estado(self):
+        return {veiculo_id: list(plano) for veiculo_id, plano in self.planos.items()}
+
+    def restaurar(self, estado):
+        self.planos = dict(estado or {})
+
+    def planejar(self, origem, alvos):
+        # Vizinho mais próximo a partir da posição atual
+        # Com os candidatos em ordem, min() já desempata pelo menor índice (como mais_proximo)
+        d = self.distancia
+        restantes = sorted(alvos)
+        percurso = [origem]
+        while restantes:
+            atual = percurso[-1]
+            proximo = min(restantes, key=lambda ponto: d(atual, ponto))
+            restantes.remove(proximo)
+            percurso.append(proximo)
+        self.melhorar_2opt(percurso, self.JANELA_2OPT)
+        return percurso[1:]
+
+    def inserir(self, percurso, ponto):
+        # Inserção mais barata em caminho aberto: entre dois pontos consecutivos ou no fim
+        d = self.distancia
+        melhor, melhor_custo = len(percurso), d(percurso[-1], ponto)
+        for i in range(1, len(percurso)):
+            custo = d(percurso[i - 1], ponto) + d(ponto, percurso[i]) - d(percurso[i - 1], percurso[i])
+            if custo < melhor_custo - 1e-9:
+                melhor, melhor_custo = i, custo
+        percurso.insert(melhor, ponto)
+
+    def melhorar_2opt(self, percurso, fim):
+        # Caminho aberto com início fixo: inverte trechos dentro de percurso[:fim] que encurtam o percurso,
+        # por até PASSADAS_2OPT passadas
+        d = self.distancia
+        fim = min(fim, len(percurso))
+        for _ in range(self.PASSADAS_2OPT):
+            melhorou = False
+            for i in range(1, fim - 1):
+                for j in range(i + 1, fim):
+                    antes = d(percurso[i - 1], percurso[i])
+                    depois = d(percurso[i - 1], percurso[j])
+                    if j + 1 < len(percurso):
+                        antes += d(percurso[j], percurso[j + 1])
+                        depois += d(percurso[i], percurso[j + 1])
+                    if depois < antes - 1e-9:
+                        percurso[i:j + 1] = reversed(percurso[i:j + 1])
+                        melhorou = True
+            if not melhorou:
+                break
+
+ROTEAMENTOS = {classe.nome: classe for classe in (RotaCiclica, RotaDestinoProximo, RotaDemanda, RotaTSP)}
+
+def criar_roteamento(nome, numero_pontos, distancia=None):
+    if nome not in ROTEAMENTOS:
+        raise ValueError(f"Roteamento desconhecido: {nome}")
+    return ROTEAMENTOS[nome](numero_pontos, distancia)
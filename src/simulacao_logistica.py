@@ -1,172 +1,629 @@
 from datetime import datetime
 import os
+import sys
+import json
+import argparse
+import logging
 import shutil  # Importa o módulo shutil
 import threading
-import queue
 import time
+import gc
+import signal
 import random
-from tkinter import Tk, Label, Button, Frame, StringVar, Text, Scrollbar, RIGHT, Y, END, BOTH, Entry, E
-from tkinter import ttk
-from tkinter import messagebox
+import heapq
+import itertools
+from collections import deque
+from rastros import EscritorRastros, FORMATOS as FORMATOS_RASTRO
+from roteamento import ROTEAMENTOS, RotaCiclica, criar_roteamento
+from topologia import Topologia, carregar_topologia
+from metricas import Metricas, JanelaDeslizante
+from registro_eventos import RegistroEventos, ler_eventos
+from chegadas import criar_processo_chegadas
+from armazem_encomendas import ArmazemEncomendas, ENTREGUE
+from instantaneos import GravadorInstantaneos, carregar_instantaneo, VERSAO as VERSAO_INSTANTANEO
+from historico_veiculos import HistoricoVeiculo, CARREGOU, ENTREGOU
+try:
+    from tkinter import Tk, Label, Button, Frame, StringVar, Text, Scrollbar, RIGHT, Y, END, BOTH, Entry, E
+    from tkinter import ttk
+    from tkinter import messagebox
+except ImportError:  # Máquinas sem Tkinter ainda podem rodar a simulação pela linha de comando
+    Tk = None
 
 # Configurações do sistema (inicialmente vazias)
 CONFIG = {
     "numero_pontos": None,      # Número de pontos de redistribuição (S)
     "numero_veiculos": None,    # Número de veículos (C)
     "numero_encomendas": None,  # Número total de encomendas (P)
-    "capacidade_veiculo": None  # Capacidade de carga de cada veículo (A)
+    "capacidade_veiculo": None,  # Capacidade de carga de cada veículo (A)
+    "modo": "threads",          # Motor de execução: "threads" (um thread por objeto) ou "eventos" (fila de eventos com relógio virtual)
+    "semente": None,            # Semente dos geradores aleatórios (None = não determinístico)
+    "inicio_relogio": None,     # Horário inicial do relógio virtual no modo eventos (None = horário atual)
+    "registro_eventos": None,   # Arquivo onde gravar o registro de eventos para reprodução (None = não grava)
+    "diretorio_rastros": "rastros",  # Pasta onde os arquivos de rastro são gravados
+    "formato_rastros": "texto",  # "texto" (um arquivo por encomenda), "jsonl", "csv" ou "binario"
+    "roteamento": "ciclico",  # Política de rota dos veículos: "ciclico", "destino_proximo", "demanda" ou "tsp"
+    "docas": None,  # Veículos que podem carregar/descarregar ao mesmo tempo em cada ponto (None = sem limite)
+    "medir_locks": False,  # Mede a espera pelos locks das filas e do contador (simulacao_lock_espera_segundos)
+    "topologia": None,  # None (viagem aleatória entre 0,1 e 0,6 s), "aleatoria" (coordenadas sorteadas) ou caminho de um arquivo de topologia
+    "chegadas": None,  # None (as P encomendas existem desde o início), "poisson", "rajadas" ou caminho de um registro de pedidos (.csv/.jsonl)
+    "taxa_chegadas": 1.0,  # Encomendas por segundo (fora das rajadas, no processo "rajadas")
+    "duracao": None,  # Segundos simulados em que chegam encomendas (None = até P encomendas ou fim do registro de pedidos)
+    "largura_janela": 60.0,  # Largura (s) da janela deslizante de vazão e latência
+    "intervalo_relatorio": 10.0,  # Intervalo (s simulados) entre relatórios da janela
+    "relatorio_janelas": None,  # Arquivo JSON Lines para os relatórios da janela ("-" = stderr; None = só na interface)
+    "instantaneo": None,  # Arquivo onde gravar instantâneos periódicos do estado, para retomar a execução (None = não grava)
+    "intervalo_instantaneo": 60.0  # Intervalo entre instantâneos (s simulados no modo eventos, s reais no modo threads)
 }
 
-# Classe que representa uma encomenda
-class Encomenda(threading.Thread):
-    def __init__(self, id, origem, destino, pontos, interface):
+# Motor de simulação por eventos discretos
+# Em vez de um thread por objeto dormindo com time.sleep, os veículos são geradores que devolvem
+# o tempo que querem "dormir". O simulador guarda esses processos em uma fila de prioridade
+# ordenada pelo horário de retomada e avança um relógio virtual direto para o próximo evento.
+class SimuladorEventos:
+    def __init__(self, inicio=None):
+        self.agora = time.time() if inicio is None else inicio  # Relógio virtual (começa no horário real para os rastros ficarem legíveis)
+        self.eventos = []  # Fila de prioridade de (horário, sequência, processo)
+        self.sequencia = itertools.count()  # Desempate estável entre eventos no mesmo horário
+        self.eventos_processados = 0  # Quantidade de eventos executados
+
+    def relogio(self): # Substitui time.time() para os objetos da simulação
+        return self.agora
+
+    def agendar(self, processo, atraso=0.0): # Agenda a retomada de um processo após "atraso" segundos virtuais
+        heapq.heappush(self.eventos, (self.agora + atraso, next(self.sequencia), processo))
+
+    def agendar_em(self, processo, horario): # Agenda a retomada em um horário absoluto (ao retomar um instantâneo)
+        heapq.heappush(self.eventos, (max(horario, self.agora), next(self.sequencia), processo))
+
+    def executar(self, tarefa=None, intervalo=None):
+        # Retira sempre o evento mais próximo, avança o relógio e retoma o processo até o próximo "sleep"
+        # "tarefa" (opcional) é chamada a cada "intervalo" segundos virtuais, entre dois eventos: vê o estado
+        # de todos os eventos até aquele horário e não cria eventos, então não altera a execução (ex.: instantâneos)
+        proxima_tarefa = self.agora + intervalo if tarefa is not None else float("inf")
+        while self.eventos:
+            if self.eventos[0][0] > proxima_tarefa:
+                self.agora = proxima_tarefa
+                tarefa()
+                proxima_tarefa += intervalo
+                continue
+            horario, _, processo = heapq.heappop(self.eventos)
+            self.agora = horario
+            self.eventos_processados += 1
+            try:
+                atraso = next(processo)
+            except StopIteration:
+                continue  # O processo terminou (ex.: veículo encerrou as entregas)
+            self.agendar(processo, atraso)
+
+# Carga de um veículo, indexada pelo ponto de destino
+# Descarregar em um ponto só toca nas encomendas endereçadas a ele, em vez de percorrer toda a carga.
+# Dentro de cada destino a ordem de carregamento é mantida. As encomendas são índices no ArmazemEncomendas.
+class CargaVeiculo:
+    def __init__(self):
+        self.por_destino = {}  # destino -> deque de índices de encomendas, na ordem em que foram carregadas
+        self.quantidade = 0  # Total de encomendas a bordo
+
+    def __len__(self):
+        return self.quantidade
+
+    def __iter__(self): # Percorre todas as encomendas a bordo (usado na interface e nos relatórios)
+        for fila in self.por_destino.values():
+            yield from fila
+
+    def adicionar(self, encomenda, destino):
+        fila = self.por_destino.get(destino)
+        if fila is None:
+            fila = self.por_destino[destino] = deque()
+        fila.append(encomenda)
+        self.quantidade += 1
+
+    def proxima(self, destino): # Próxima encomenda a descarregar em "destino" (ou None)
+        fila = self.por_destino.get(destino)
+        return fila[0] if fila else None
+
+    def retirar(self, destino): # Remove e devolve a próxima encomenda de "destino" em O(1)
+        fila = self.por_destino[destino]
+        encomenda = fila.popleft()
+        if not fila:
+            del self.por_destino[destino]
+        self.quantidade -= 1
+        return encomenda
+
+# Thread que conduz um processo da simulação: um gerador de tempos de espera (ciclo), como o do veículo
+# No modo threads cada tempo vira uma espera real. Cada passo do gerador roda com passo_lock segurado e
+# "retomada" guarda o horário em que o processo volta a agir (None quando terminou), então quem segura o
+# passo_lock de todos os processos vê a simulação parada entre dois passos (ver Instantaneos).
+class ProcessoSimulacao(threading.Thread):
+    def __init__(self, relogio=time.time):
         super().__init__()
-        self.id = id  # ID único da encomenda
-        self.origem = origem  # Ponto de origem da encomenda
-        self.destino = destino  # Ponto de destino da encomenda
-        self.pontos = pontos  # Referência aos pontos
-        self.horario_criacao = time.time()  # Momento em que a encomenda foi criada
-        self.horario_carregado = None  # Quando foi carregada em um veículo
-        self.horario_descarregado = None  # Quando foi descarregada no destino
-        self.veiculo_id = None  # ID do veículo que transportou a encomenda
-        self.delivered_event = threading.Event()  # Evento para sinalizar entrega
-        self.interface = interface  # Referência para a interface
+        self.relogio = relogio  # Fonte de horário (time.time no modo threads, relógio virtual no modo eventos)
+        self.passo_lock = threading.Lock()
+        self.retomada = relogio()  # Horário do próximo passo (o primeiro é imediato)
+        self.passos = None  # Gerador já iniciado a usar no lugar de ciclo() (ao retomar um instantâneo)
+
+    def esperar(self, atraso):
+        time.sleep(atraso)
 
     def run(self):
-        # Enfileira-se no ponto de origem
-        self.pontos[self.origem].enqueue_encomenda(self)
-        # Atualiza a interface do ponto
-        self.interface.update_point(self.origem, self.pontos[self.origem].get_cargas())
-        # Aguarda ser carregada no veículo
-        while self.horario_carregado is None:
-            time.sleep(0.1)
-        # Aguarda ser entregue
-        self.delivered_event.wait()
-        # Registra o horário de descarregamento
-        self.horario_descarregado = time.time()
-        # Escreve o arquivo de rastro
-        self.gerar_rastro()
-        # Thread finaliza após entrega
-
-    def gerar_rastro(self):
-        # Formata os horários
-        horario_criacao = time.strftime('%H:%M:%S', time.localtime(self.horario_criacao))
-        horario_carregado = time.strftime('%H:%M:%S', time.localtime(self.horario_carregado))
-        horario_descarregado = time.strftime('%H:%M:%S', time.localtime(self.horario_descarregado))
-
-        # Conteúdo do arquivo de rastro
-        conteudo = (
-            f"Encomenda ID: {self.id}\n"
-            f"Origem: {self.origem}\n"
-            f"Destino: {self.destino}\n"
-            f"Horário de Chegada ao Ponto de Origem: {horario_criacao}\n"  # Assumindo que chegou ao ponto ao ser criada
-            f"Horário de Carregamento no Veículo: {horario_carregado}\n"
-            f"ID do Veículo: {self.veiculo_id}\n"
-            f"Horário de Descarregamento no Destino: {horario_descarregado}\n"
-        )
-
-        # Nome do arquivo de rastro
-        nome_arquivo = f"rastros/encomenda_{self.id}.txt"
-
-        # Escreve o arquivo
-        with open(nome_arquivo, 'w') as arquivo:
-            arquivo.write(conteudo)
+        passos = self.passos or self.ciclo()
+        atraso = self.retomada - self.relogio()
+        while True:
+            if atraso > 0:
+                self.esperar(atraso)
+            with self.passo_lock:
+                atraso = next(passos, None)
+                self.retomada = None if atraso is None else self.relogio() + atraso
+            if atraso is None:
+                return
 
 # Classe que representa um veículo
-class Veiculo(threading.Thread):
-    def __init__(self, id, pontos, capacidade, lock_pontos, encomendas_restantes, monitoramento_lock, interface):
-        super().__init__()
+class Veiculo(ProcessoSimulacao):
+    def __init__(self, id, pontos, armazem, capacidade, encomendas_restantes, monitoramento_lock, interface, relogio=time.time, roteamento=None, topologia=None, metricas=None, rng=None, registro=None):
+        super().__init__(relogio)
         self.id = id  # ID do veículo
         self.pontos = pontos  # Lista de pontos de redistribuição
+        self.armazem = armazem  # ArmazemEncomendas com o estado das encomendas
         self.capacidade = capacidade  # Capacidade máxima de carga
-        self.carga = []  # Lista de encomendas carregadas
+        self.carga = CargaVeiculo()  # Encomendas carregadas, indexadas pelo destino
         self.carga_semaphore = threading.Semaphore(capacidade)  # Semáforo para controlar a capacidade
-        self.local_atual = random.randint(0, len(pontos) - 1)  # Ponto inicial aleatório
-        self.lock_pontos = lock_pontos  # Locks para sincronizar acesso aos pontos
+        self.rng = rng or random.Random()  # Gerador aleatório próprio do veículo (ponto inicial e tempos)
+        self.local_atual = self.rng.randint(0, len(pontos) - 1)  # Ponto inicial aleatório
         self.encomendas_restantes = encomendas_restantes  # Controle de encomendas pendentes
         self.monitoramento_lock = monitoramento_lock  # Lock usado para sincronizar operações que alteram o número de encomendas restantes. Garante que dois veículos não reduzam o contador simultaneamente.
         self.interface = interface  # Referência para a interface gráfica
-        self.historico = []  # Histórico de ações do veículo
+        self.historico = HistoricoVeiculo()  # Histórico de ações do veículo (registros compactos, formatados só ao exibir)
+        self.roteamento = roteamento or RotaCiclica(len(pontos))  # Política que escolhe o próximo ponto
+        self.topologia = topologia  # Matriz de tempos de viagem (None = tempo aleatório, como no modelo original)
+        self.metricas = metricas  # Métricas da execução (opcional)
+        self.registro = registro  # RegistroEventos da execução (opcional)
+        self.carga_tempo = 0.0  # Soma de (encomendas a bordo x tempo), usada para medir a utilização da capacidade
+        self.descarregando = False  # Parado no meio de uma descarga, com a doca ocupada (visto pelos instantâneos)
+        self.horario_lote = None  # Horário gravado no registro de eventos para o último lote carregado
 
-    def run(self):
-        # Loop principal do veículo
+    def ciclo(self):
+        # Loop principal do veículo, compartilhado pelos dois modos de execução.
+        # Em vez de dormir, devolve (yield) o tempo de espera: o thread dorme de verdade
+        # e o SimuladorEventos apenas agenda a retomada no relógio virtual.
         while True:
-            # Verifica se todas as encomendas foram entregues
-            with self.monitoramento_lock:
-                if self.encomendas_restantes[0] <= 0:
-                    self.interface.update_status(f"Veículo {self.id} terminou as entregas.")
-                    break
+            ponto_atual = self.pontos[self.local_atual]
+            if self.descarregando:
+                # Retomado de um instantâneo no meio de uma descarga: a doca já está ocupada
+                yield from self.descarregar(ponto_atual)
+            else:
+                # Verifica se todas as encomendas foram entregues
+                with self.monitoramento_lock:
+                    if self.encomendas_restantes[0] <= 0:
+                        self.interface.update_status(f"Veículo {self.id} terminou as entregas.")
+                        return
 
-            # Acessa o ponto atual com lock para evitar conflitos
-            with self.lock_pontos[self.local_atual]: # O lock do ponto atual impede que outro veículo acesse o mesmo ponto simultaneamente.
-                ponto_atual = self.pontos[self.local_atual]
+                # Ocupa uma doca do ponto atual; se todas estiverem ocupadas, segue para o próximo ponto
+                if ponto_atual.ocupar_doca():
+                    # Retira de uma vez até a capacidade livre; nenhum lock fica segurado durante as chamadas abaixo
+                    # (as cargas entram no registro de eventos dentro de retirar_lote, ainda sob o fila_lock)
+                    armazem = self.armazem
+                    for encomenda in ponto_atual.retirar_lote(self.capacidade - len(self.carga), None if self.registro is None else self.registrar_cargas):
+                        self.carga_semaphore.acquire()  # Adquire um espaço de carga
+                        agora = self.relogio() if self.registro is None else self.horario_lote
+                        armazem.carregar(encomenda, self.id, agora) # Informações sobre a encomenda são atualizadas
+                        encomenda_id = armazem.ids[encomenda]
+                        if self.metricas is not None:
+                            self.metricas.registrar_carga(self.id, armazem.horario_criacao[encomenda], agora)
+                        self.carga.adicionar(encomenda, armazem.destino[encomenda]) # A encomenda é adicionada à carga do veículo
+                        self.historico.registrar(CARREGOU, encomenda_id, self.local_atual)
+                        self.interface.update_status(f"Veículo {self.id} carregou encomenda {encomenda_id} no ponto {self.local_atual}.")
 
-                # Carrega encomendas no veículo enquanto houver encomendas no ponto
-                while len(self.carga) < self.capacidade:
-                    encomenda = ponto_atual.get_encomenda()
-                    if encomenda is None:
-                        break
-                    self.carga_semaphore.acquire()  # Adquire um espaço de carga
-                    encomenda.horario_carregado = time.time() # Informações sobre a encomenda são atualizadas
-                    encomenda.veiculo_id = self.id # Informações sobre a encomenda são atualizadas
-                    self.carga.append(encomenda) # A encomenda é adicionada à lista de carga do veículo
-                    self.historico.append(f"Carregou encomenda {encomenda.id} no ponto {self.local_atual}")
-                    self.interface.update_status(f"Veículo {self.id} carregou encomenda {encomenda.id} no ponto {self.local_atual}.")
-                    # Atualiza a interface do ponto
-                    self.interface.update_point(self.local_atual, ponto_atual.get_cargas())
-
-            # Descarrega encomendas que chegaram ao destino
-            for encomenda in self.carga[:]:  # Feito com a cópia da lista para não causar problemas com a modificação da própria lista
-                if encomenda.destino == self.local_atual:
-                    # Simula tempo aleatório de descarregamento
-                    time.sleep(random.uniform(1, 1.9))
-                    encomenda.horario_descarregado = time.time() #Atualiza o horário de descarregamento
-                    self.carga.remove(encomenda) # Remove a encomenda da carga do veículo
-                    self.carga_semaphore.release()  # Libera um espaço de carga
-                    with self.monitoramento_lock:
-                        self.encomendas_restantes[0] -= 1 # Reduz o contador global de encomendas restantes 
-                    encomenda.delivered_event.set()  # Sinaliza que a encomenda foi entregue
-                    self.historico.append(f"Entregou encomenda {encomenda.id} no ponto {self.local_atual}")
-                    self.interface.update_status(f"Veículo {self.id} entregou encomenda {encomenda.id} no ponto {self.local_atual}.")
+                    # Atualiza a interface do ponto (só o tamanho da fila)
+                    tamanho_fila = ponto_atual.tamanho_fila()
+                    self.interface.update_point(self.local_atual, tamanho_fila)
+                    if self.metricas is not None:
+                        self.metricas.registrar_fila(self.local_atual, self.relogio(), tamanho_fila)
+
+                    yield from self.descarregar(ponto_atual)
+                else:
+                    if self.metricas is not None:
+                        self.metricas.registrar_doca_ocupada(self.local_atual)
+                    self.interface.update_status(f"Veículo {self.id}: docas do ponto {self.local_atual} ocupadas, seguindo para o próximo ponto.")
 
             # Atualiza a posição do veículo na interface
-            self.interface.update_vehicle(self.id, self.local_atual, [e.id for e in self.carga])
+            self.interface.update_vehicle(self.id, self.local_atual, len(self.carga))
+
+            # Move para o próximo ponto escolhido pela política de rota (cíclica por padrão)
+            proximo = self.roteamento.proximo_ponto(self)
+            if self.topologia is not None:
+                atraso = self.topologia.tempo(self.local_atual, proximo)  # Tempo de viagem da matriz
+            else:
+                atraso = self.rng.uniform(0.1, 0.6)  # Simula tempo de viagem
+            if self.registro is not None:
+                self.registro.viagem(self.relogio(), self.id, self.local_atual, proximo, atraso)
+            self.local_atual = proximo
+            self.carga_tempo += len(self.carga) * atraso
+            yield atraso
+
+    # Grava no registro de eventos as cargas de um lote; chamado por retirar_lote ainda sob o fila_lock do ponto
+    # O lote todo usa o mesmo horário, que o ciclo também usa ao carregar, então a reprodução vê os mesmos horários
+    def registrar_cargas(self, lote):
+        self.horario_lote = agora = self.relogio()
+        for encomenda in lote:
+            self.registro.carga(agora, self.id, self.local_atual, self.armazem.ids[encomenda])
+
+    # Descarrega as encomendas que chegaram ao destino (só as endereçadas ao ponto atual) e libera a doca
+    # Durante a espera de cada descarga "descarregando" fica True; retomado de um instantâneo nesse estado,
+    # o tempo da descarga em andamento já passou e a entrega é concluída direto.
+    def descarregar(self, ponto_atual):
+        armazem = self.armazem
+        encomenda = self.carga.proxima(self.local_atual)
+        atraso = 0.0  # Retomado no meio de uma descarga, o tempo dela já foi contado antes do instantâneo
+        while encomenda is not None:
+            if not self.descarregando:
+                # Simula tempo aleatório de descarregamento
+                atraso = self.rng.uniform(1, 1.9)
+                self.carga_tempo += len(self.carga) * atraso
+                self.descarregando = True
+                yield atraso
+            self.descarregando = False
+            self.carga.retirar(self.local_atual) # Remove a encomenda da carga do veículo
+            self.carga_semaphore.release()  # Libera um espaço de carga
+            with self.monitoramento_lock:
+                self.encomendas_restantes[0] -= 1 # Reduz o contador global de encomendas restantes 
+            agora = self.relogio()
+            armazem.entregar(encomenda, agora)  # Registra o horário de descarregamento e grava o rastro
+            encomenda_id = armazem.ids[encomenda]
+            if self.metricas is not None:
+                self.metricas.registrar_entrega(self.id, armazem.horario_criacao[encomenda], armazem.horario_carregado[encomenda], agora)
+            if self.registro is not None:
+                self.registro.entrega(agora, self.id, self.local_atual, encomenda_id, atraso)
+            armazem.liberar(encomenda)
+            self.historico.registrar(ENTREGOU, encomenda_id, self.local_atual)
+            self.interface.update_status(f"Veículo {self.id} entregou encomenda {encomenda_id} no ponto {self.local_atual}.")
+            encomenda = self.carga.proxima(self.local_atual)
+        ponto_atual.liberar_doca()
+
+    def estado(self): # Cópia do estado do veículo para um instantâneo
+        return {
+            "id": self.id,
+            "local_atual": self.local_atual,
+            "carga": [(destino, list(fila)) for destino, fila in self.carga.por_destino.items()],
+            "carga_tempo": self.carga_tempo,
+            "descarregando": self.descarregando,
+            "rng": self.rng.getstate(),
+            "historico": self.historico.estado(),
+        }
 
-            # Move para o próximo ponto (cíclico)
-            self.local_atual = (self.local_atual + 1) % len(self.pontos)
-            time.sleep(random.uniform(0.1, 0.6))  # Simula tempo de viagem
+    def restaurar(self, estado): # Continua do estado de um instantâneo (a doca de uma descarga em andamento volta a ser ocupada)
+        self.local_atual = estado["local_atual"]
+        for destino, fila in estado["carga"]:
+            for encomenda in fila:
+                self.carga.adicionar(encomenda, destino)
+                self.carga_semaphore.acquire()
+        self.carga_tempo = estado["carga_tempo"]
+        self.descarregando = estado["descarregando"]
+        if self.descarregando:
+            self.pontos[self.local_atual].ocupar_doca()
+        self.rng.setstate(estado["rng"])
+        self.historico = HistoricoVeiculo.restaurar(estado["historico"])
 
 # Classe que representa um ponto de redistribuição
-class Ponto(threading.Thread):
-    def __init__(self, id):
-        super().__init__()
+# O ponto é apenas uma fila compartilhada; quem age sobre ela são os veículos e as encomendas, então não precisa de thread.
+# A fila tem uma única camada de sincronização (fila_lock, segurado só durante as operações na deque) e o
+# ponto tem "docas" vagas de carga/descarga, então vários veículos podem atender o mesmo ponto ao mesmo tempo.
+class Ponto:
+    def __init__(self, id, coordenadas=None, docas=None):
         self.id = id  # ID do ponto
-        self.fila_encomendas = queue.Queue()  # Fila de encomendas no ponto
+        self.coordenadas = coordenadas  # (x, y) do ponto, quando a topologia vem de coordenadas
+        self.fila_encomendas = deque()  # Fila de encomendas no ponto
         self.fila_lock = threading.Lock()  # Lock para acesso à fila. Garante que apenas um thread (veículo ou encomenda) possa modificar a fila por vez, evitando condições de corrida.
-        self.running = True  # Controle para finalizar o thread, enquanto for True, o método run continuará em execução
+        self.docas = threading.BoundedSemaphore(docas) if docas else None  # Vagas para veículos carregarem/descarregarem (None = sem limite)
 
-    def enqueue_encomenda(self, encomenda): # Adicionar uma encomenda na fila do ponto
+    # Adicionar uma encomenda na fila do ponto
+    # "ao_enfileirar" (opcional) é chamado com a encomenda ainda sob o fila_lock, para o registro de eventos
+    # gravar as chegadas na mesma ordem em que entram na fila
+    def enqueue_encomenda(self, encomenda, ao_enfileirar=None):
         with self.fila_lock:
-            self.fila_encomendas.put(encomenda)
+            self.fila_encomendas.append(encomenda)
+            if ao_enfileirar is not None:
+                ao_enfileirar(encomenda)
 
     def get_encomenda(self): # Retirar uma encomenda da fila para que um veículo possa carregá-la
         with self.fila_lock:
-            if not self.fila_encomendas.empty(): # Verifica se a fila não está vazia
-                return self.fila_encomendas.get() # Se houver encomendas disponíveis, remove e retorna a encomenda
-            else:
-                return None
+            return self.fila_encomendas.popleft() if self.fila_encomendas else None
+
+    # Retira até "quantidade" encomendas, na ordem de chegada, com uma única aquisição do lock
+    # "ao_retirar" (opcional) é chamado com o lote ainda sob o fila_lock: com vários veículos esvaziando o mesmo
+    # ponto, é o que garante que as cargas entram no registro de eventos na ordem em que saíram da fila
+    def retirar_lote(self, quantidade, ao_retirar=None):
+        with self.fila_lock:
+            fila = self.fila_encomendas
+            lote = [fila.popleft() for _ in range(min(quantidade, len(fila)))]
+            if ao_retirar is not None and lote:
+                ao_retirar(lote)
+            return lote
 
-    def get_cargas(self): # Retornar uma lista com os IDs das encomendas atualmente na fila do ponto
+    def get_cargas(self): # Retornar uma lista com os índices (no ArmazemEncomendas) das encomendas atualmente na fila do ponto
         with self.fila_lock:
-            return [encomenda.id for encomenda in list(self.fila_encomendas.queue)]
+            return list(self.fila_encomendas)
+
+    def tamanho_fila(self): # Quantidade de encomendas aguardando (usado pela interface e pelas políticas de rota)
+        return len(self.fila_encomendas)  # len() de uma deque é atômico, não precisa do lock
+
+    def ocupar_doca(self): # Tenta ocupar uma doca sem esperar (False = todas ocupadas)
+        return self.docas is None or self.docas.acquire(blocking=False)
+
+    def liberar_doca(self):
+        if self.docas is not None:
+            self.docas.release()
+
+# Injeta as encomendas do sistema aberto ao longo do tempo, seguindo um processo de chegadas (ver chegadas.py)
+# Como o ciclo do veículo, devolve (yield) o tempo até a próxima chegada, então roda como thread ou no SimuladorEventos.
+# Enquanto houver chegadas por vir, mantém uma reserva de 1 no contador de encomendas restantes para os veículos não encerrarem.
+# "parar" encerra as chegadas antes da hora (ex.: Ctrl+C em uma execução sem fim); as encomendas já geradas ainda são entregues.
+class InjetorEncomendas(ProcessoSimulacao):
+    def __init__(self, processo, pontos, armazem, encomendas_restantes, monitoramento_lock, interface, relogio=time.time,
+                 limite=None, duracao=None, metricas=None, registro=None):
+        super().__init__(relogio)
+        self.processo = processo  # Iterável de (tempo desde o início, origem, destino)
+        self.pontos = pontos
+        self.armazem = armazem  # ArmazemEncomendas com reutilizar=True: a memória fica limitada às encomendas em circulação
+        self.encomendas_restantes = encomendas_restantes
+        self.monitoramento_lock = monitoramento_lock
+        self.interface = interface
+        self.limite = limite  # Máximo de encomendas geradas (None = sem limite)
+        self.duracao = duracao  # Segundos simulados em que chegam encomendas (None = sem limite)
+        self.metricas = metricas
+        self.registro = registro
+        self.inicio = relogio()
+        self.geradas = 0  # Encomendas criadas até agora (também é o ID da próxima)
+        self.pendente = None  # Chegada (tempo, origem, destino) esperando a hora de acontecer (vista pelos instantâneos)
+        self.erro = None  # Exceção do thread (ex.: registro de pedidos inválido), relançada por quem espera o join
+        self.parar = threading.Event()  # Encerra as chegadas; no modo threads também interrompe a espera pela próxima
+
+    def esperar(self, atraso):
+        self.parar.wait(atraso)
 
     def run(self):
-        # O ponto pode realizar operações adicionais se necessário
-        while self.running:
-            time.sleep(0.1)  # Simula alguma atividade
+        try:
+            super().run()
+        except Exception as e:
+            self.erro = e
+
+    def ciclo(self):
+        try:
+            chegadas = iter(self.processo)
+            if self.pendente is not None:  # Retomado de um instantâneo: a espera pela chegada pendente já passou
+                chegadas = itertools.chain([self.pendente], chegadas)
+            for tempo, origem, destino in chegadas:
+                if self.parar.is_set():
+                    break
+                if self.pendente is None:
+                    if self.limite is not None and self.geradas >= self.limite:
+                        break
+                    if self.duracao is not None and tempo > self.duracao:
+                        break
+                    atraso = tempo - (self.relogio() - self.inicio)
+                    if atraso > 0:
+                        self.pendente = (tempo, origem, destino)
+                        yield atraso
+                        if self.parar.is_set():
+                            break
+                self.pendente = None
+                with self.monitoramento_lock:
+                    self.encomendas_restantes[0] += 1
+                # O índice da encomenda volta para o armazém assim que ela é entregue
+                agora = self.relogio()
+                encomenda = self.armazem.criar(self.geradas, origem, destino, agora)
+                self.pontos[origem].enqueue_encomenda(encomenda, None if self.registro is None else self.registrar_chegada)
+                tamanho_fila = self.pontos[origem].tamanho_fila()
+                self.interface.update_point(origem, tamanho_fila)
+                if self.metricas is not None:
+                    self.metricas.registrar_fila(origem, agora, tamanho_fila)
+                self.geradas += 1
+        finally:
+            # Libera a reserva (também em caso de erro): daí em diante os veículos encerram quando as encomendas já geradas forem entregues
+            with self.monitoramento_lock:
+                self.encomendas_restantes[0] -= 1
+        self.interface.update_status(f"Chegadas encerradas: {self.geradas} encomendas geradas.")
+
+    # Grava a chegada no registro de eventos; chamado por enqueue_encomenda ainda sob o fila_lock do ponto, então
+    # nenhum veículo registra a carga de uma encomenda antes da chegada dela
+    def registrar_chegada(self, encomenda):
+        armazem = self.armazem
+        self.registro.encomenda(armazem.horario_criacao[encomenda], armazem.ids[encomenda], armazem.origem[encomenda], armazem.destino[encomenda])
+
+    def estado(self):
+        return {"inicio": self.inicio, "geradas": self.geradas, "pendente": self.pendente, "processo": self.processo.estado()}
+
+    def restaurar(self, estado):
+        self.inicio = estado["inicio"]
+        self.geradas = estado["geradas"]
+        self.pendente = estado["pendente"]
+        self.processo.restaurar(estado["processo"])
+
+# Relata periodicamente a vazão e a latência da janela deslizante das métricas enquanto a execução acontece
+class RelatorioJanelas(ProcessoSimulacao):
+    def __init__(self, metricas, intervalo, encomendas_restantes, monitoramento_lock, interface, relogio=time.time, arquivo=None):
+        super().__init__(relogio)
+        self.metricas = metricas
+        self.intervalo = intervalo
+        self.encomendas_restantes = encomendas_restantes
+        self.monitoramento_lock = monitoramento_lock
+        self.interface = interface
+        self.arquivo = arquivo  # Recebe uma linha JSON por relatório (opcional)
+        self.inicio = relogio()
+        self.parar = threading.Event()  # No modo threads, interrompe a espera quando a execução termina
+
+    def esperar(self, atraso):
+        self.parar.wait(atraso)
+
+    def ciclo(self):
+        while True:
+            yield self.intervalo
+            with self.monitoramento_lock:
+                pendentes = self.encomendas_restantes[0]
+            agora = self.relogio()
+            resumo = self.metricas.resumo_janela(agora)
+            if resumo["entregas"]:
+                self.interface.update_status(f"Últimos {self.metricas.janela.largura:g} s: {resumo['vazao']:.2f} entregas/s, "
+                                             f"latência média {resumo['latencia_media']:.1f} s, p95 {resumo['latencia_p95']:.1f} s.")
+            if self.arquivo is not None:
+                self.arquivo.write(json.dumps({"tempo": agora - self.inicio, **resumo, "pendentes": max(0, pendentes)}) + "\n")
+                self.arquivo.flush()
+            if pendentes <= 0:
+                return
+
+    def estado(self):
+        return {"inicio": self.inicio}
+
+    def restaurar(self, estado): # O próximo relatório sai no horário de retomada guardado no instantâneo
+        self.inicio = estado["inicio"]
+        self.passos = self.ciclo()
+        next(self.passos)  # Pula a espera do intervalo que abre o ciclo
+
+# Instantâneos periódicos do estado da execução, para retomá-la depois (ver instantaneos.py e retomar)
+# No modo eventos a captura é uma tarefa do SimuladorEventos, chamada entre dois eventos a cada "intervalo" segundos
+# virtuais sem criar eventos, então a execução segue idêntica à sem instantâneos. No modo threads, a cada "intervalo"
+# segundos reais, este thread segura o passo_lock de todos os processos: cada um termina o passo em andamento e fica
+# parado até a captura acabar. A captura só copia o estado; serializar e gravar fica com o GravadorInstantaneos.
+# Se a gravação anterior ainda não terminou, no modo threads a captura é pulada. No modo eventos ela acontece mesmo
+# assim (o gravador fica só com a mais recente), então as capturas seguem o relógio virtual e o instantâneo que fica
+# no arquivo ao fim da execução depende só da semente, não da velocidade do disco.
+# A pausa cresce com P: as filas dos pontos e as colunas mutáveis do armazém são copiadas inteiras.
+class Instantaneos(threading.Thread):
+    def __init__(self, caminho, intervalo, config, simulador, relogio, inicio, pontos, armazem, veiculos, injetor, relatorio,
+                 encomendas_restantes, metricas, roteamento, processos, interface):
+        super().__init__(name="Instantaneos", daemon=True)
+        self.intervalo = intervalo
+        self.config = config
+        self.simulador = simulador  # None no modo threads
+        self.relogio = relogio
+        self.inicio = inicio
+        self.pontos = pontos
+        self.armazem = armazem
+        self.veiculos = veiculos
+        self.injetor = injetor  # Só no sistema aberto
+        self.relatorio = relatorio
+        self.encomendas_restantes = encomendas_restantes
+        self.metricas = metricas
+        self.roteamento = roteamento
+        self.processos = processos  # chave ("veiculo/3", "injetor", "relatorio") -> processo em execução
+        self.interface = interface
+        self.chaves = {}  # Modo eventos: gerador agendado no simulador -> chave do processo
+        self.parar = threading.Event()
+        self.capturados = 0
+        self.ignorados = 0  # Capturas puladas porque a gravação anterior não tinha terminado (só no modo threads)
+        self.gravador = GravadorInstantaneos(caminho)
+
+    def run(self):
+        while not self.parar.wait(self.intervalo):
+            self.capturar()
+
+    def fechar(self):
+        self.gravador.fechar()
+
+    def capturar(self):
+        if self.simulador is None and self.gravador.ocupado():  # O anterior ainda está sendo gravado: capturar agora só competiria com ele
+            self.ignorados += 1
+            return
+        inicio_pausa = time.perf_counter()
+        locks = [processo.passo_lock for processo in self.processos.values()] if self.simulador is None else []
+        coletor = gc.isenabled()
+        gc.disable()  # As cópias alocam muito; uma coleta disparada no meio delas alongaria a pausa
+        for lock in locks:
+            lock.acquire()
+        try:
+            estado = self.estado()
+        finally:
+            for lock in locks:
+                lock.release()
+            if coletor:
+                gc.enable()
+        pausa = time.perf_counter() - inicio_pausa  # Tempo em que os processos ficaram parados
+        self.metricas.registrar_pausa_instantaneo(pausa)
+        self.gravador.enviar(estado)
+        self.capturados += 1
+        self.interface.update_status(f"Instantâneo {self.capturados} capturado ({pausa * 1000:.1f} ms de pausa).")
+
+    def agenda(self): # (chave, horário de retomada) de cada processo ainda ativo, na ordem em que voltariam a agir
+        if self.simulador is not None:
+            return [(self.chaves[processo], horario) for horario, _, processo in sorted(self.simulador.eventos)]
+        ativos = sorted((processo.retomada, chave) for chave, processo in self.processos.items() if processo.retomada is not None)
+        return [(chave, retomada) for retomada, chave in ativos]
+
+    def estado(self): # Chamado com a simulação parada; só copia (colunas, filas, cargas, métricas)
+        return {
+            "versao": VERSAO_INSTANTANEO,
+            "config": dict(self.config),
+            "agora": self.relogio(),
+            "inicio": self.inicio,
+            "eventos_processados": self.simulador.eventos_processados if self.simulador else None,
+            "encomendas_restantes": self.encomendas_restantes[0],
+            "agenda": self.agenda(),
+            "armazem": self.armazem.estado(),
+            "pontos": [list(ponto.fila_encomendas) for ponto in self.pontos],
+            "veiculos": [veiculo.estado() for veiculo in self.veiculos],
+            "injetor": self.injetor.estado() if self.injetor else None,
+            "relatorio": self.relatorio.estado() if self.relatorio else None,
+            "roteamento": self.roteamento.estado(),
+            "metricas": self.metricas.estado(),
+        }
+
+# Interface vazia: mesmos métodos da Interface gráfica, mas não faz nada.
+# Usada nas execuções sem tela (linha de comando, varreduras de parâmetros).
+class InterfaceNula:
+    def update_status(self, message):
+        pass
+
+    def update_vehicle(self, vehicle_id, location, carga):
+        pass
+
+    def update_point(self, point_id, quantidade):
+        pass
+
+    def display_results(self, results):
+        pass
+
+# Interface que apenas registra os eventos no logging (útil para depurar execuções sem tela)
+class InterfaceLog(InterfaceNula):
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger("simulacao_logistica")
+
+    def update_status(self, message):
+        self.logger.info(message)
+
+    def update_vehicle(self, vehicle_id, location, carga):
+        self.logger.debug("Veículo %s no ponto %s, carga: %s", vehicle_id, location, carga)
+
+    def update_point(self, point_id, quantidade):
+        self.logger.debug("Ponto %s, %s encomendas na fila", point_id, quantidade)
+
+# Valida os parâmetros da simulação (mesmas regras da interface gráfica e da linha de comando)
+# No sistema aberto ("aberto") P é só um limite opcional de encomendas geradas
+def validar_parametros(S, C, A, P, aberto=False):
+    if S <= 0 or C <= 0 or A <= 0 or (P is not None and P <= 0) or (P is None and not aberto):
+        raise ValueError("Todos os valores devem ser inteiros positivos.")
+    if S < 2:
+        raise ValueError("São necessários pelo menos 2 pontos para que origem e destino sejam diferentes.")
+    if A <= C:
+        raise ValueError("A capacidade A deve ser maior que o número de veículos C.")
+    if not aberto and P <= A:
+        raise ValueError("O número de encomendas P deve ser maior que a capacidade A.")
+
+# Apaga e recria a pasta de rastros
+def preparar_diretorio_rastros(diretorio):
+    if os.path.exists(diretorio):
+        shutil.rmtree(diretorio)
+    os.makedirs(diretorio)
+
+# Verdadeiro se "caminho" fica dentro de "diretorio" (e seria apagado por preparar_diretorio_rastros)
+def dentro_do_diretorio(caminho, diretorio):
+    caminho, diretorio = os.path.realpath(caminho), os.path.realpath(diretorio)
+    return os.path.commonpath([caminho, diretorio]) == diretorio
 
 # Interface gráfica
+# Os threads da simulação não mexem nos widgets: update_status/update_vehicle/update_point apenas
+# guardam o estado mais recente de cada veículo e ponto, e renderizar() redesenha o que mudou
+# em uma taxa fixa de quadros. Assim o laço do Tk não é inundado de callbacks com muitos veículos.
 class Interface:
+    QUADROS_POR_SEGUNDO = 10  # Taxa de redesenho da interface
+
     def __init__(self, master):
         self.master = master  # Janela principal do Tkinter
         self.master.title("Simulação de Logística")  # Título da janela
@@ -176,6 +633,13 @@ class Interface:
         self.status_var = StringVar()  # Variável para exibir mensagens de status
         self.status_var.set("Insira os parâmetros e clique em 'Iniciar Simulação'.")  # Mensagem inicial
         self.results = []  # Lista para armazenar o histórico final
+        self.capacidade = None  # Capacidade A, para mostrar a carga como "n/A"
+
+        # Estado pendente de redesenho (só o mais recente de cada veículo/ponto)
+        self.estado_lock = threading.Lock()
+        self.status_pendente = None
+        self.veiculos_pendentes = {}  # id do veículo -> (ponto, quantidade de encomendas a bordo)
+        self.pontos_pendentes = {}  # id do ponto -> quantidade de encomendas na fila
 
         # Área de Status
         status_frame = Frame(master, bg="#f5f5f5", pady=10)
@@ -205,6 +669,16 @@ class Interface:
         self.entry_P = Entry(params_frame)
         self.entry_P.grid(row=3, column=1, padx=5, pady=2)
 
+        Label(params_frame, text="Modo de execução:", bg="#f5f5f5").grid(row=4, column=0, sticky=E, padx=5, pady=2)
+        self.combo_modo = ttk.Combobox(params_frame, values=["threads", "eventos"], state="readonly", width=17)
+        self.combo_modo.set(CONFIG["modo"])
+        self.combo_modo.grid(row=4, column=1, padx=5, pady=2)
+
+        Label(params_frame, text="Roteamento:", bg="#f5f5f5").grid(row=5, column=0, sticky=E, padx=5, pady=2)
+        self.combo_roteamento = ttk.Combobox(params_frame, values=list(ROTEAMENTOS), state="readonly", width=17)
+        self.combo_roteamento.set(CONFIG["roteamento"])
+        self.combo_roteamento.grid(row=5, column=1, padx=5, pady=2)
+
         # Botão de Iniciar
         button_frame = Frame(master, bg="#f5f5f5")
         button_frame.pack(fill=BOTH, pady=10)
@@ -230,25 +704,65 @@ class Interface:
         scrollbar.pack(side=RIGHT, fill=Y)
         self.history_text.pack(fill=BOTH, expand=True)
 
-    # Atualiza o status na interface
+        self.vehicle_tree = None  # Tabelas criadas ao iniciar a simulação
+        self.point_tree = None
+        self.master.after(1000 // self.QUADROS_POR_SEGUNDO, self.renderizar)
+
+    # Atualiza o status na interface (vale a última mensagem até o próximo quadro)
     def update_status(self, message):
-        self.master.after(0, lambda: self.status_var.set(message))
+        with self.estado_lock:
+            self.status_pendente = message
 
     # Atualiza a posição e carga do veículo
     def update_vehicle(self, vehicle_id, location, carga):
-        self.master.after(0, lambda: self.vehicle_frames[vehicle_id].config(text=f"No ponto {location}, Carga: {carga}"))
+        with self.estado_lock:
+            self.veiculos_pendentes[vehicle_id] = (location, carga)
+
+    # Atualiza o tamanho da fila de um ponto
+    def update_point(self, point_id, quantidade):
+        with self.estado_lock:
+            self.pontos_pendentes[point_id] = quantidade
+
+    # Redesenha, no thread do Tk, apenas os veículos e pontos que mudaram desde o último quadro
+    def renderizar(self):
+        with self.estado_lock:
+            veiculos, self.veiculos_pendentes = self.veiculos_pendentes, {}
+            pontos, self.pontos_pendentes = self.pontos_pendentes, {}
+            status, self.status_pendente = self.status_pendente, None
 
-    # Atualiza o status de um ponto
-    def update_point(self, point_id, cargas):
-        self.master.after(0, lambda: self.point_frames[point_id].config(text=f"Cargas: {cargas}"))
+        if status is not None:
+            self.status_var.set(status)
+        if self.vehicle_tree is not None:
+            for vehicle_id, (location, carga) in veiculos.items():
+                self.vehicle_tree.item(vehicle_id, values=(f"Veículo {vehicle_id}", location, f"{carga}/{self.capacidade}"))
+        if self.point_tree is not None:
+            for point_id, quantidade in pontos.items():
+                self.point_tree.item(point_id, values=(f"Ponto {point_id}", quantidade))
+        self.master.after(1000 // self.QUADROS_POR_SEGUNDO, self.renderizar)
 
     # Exibe o histórico final
     def display_results(self, results):
+        texto = "\n".join(results) + "\n"  # Um único insert, mesmo com centenas de milhares de linhas
         self.master.after(0, lambda: [
             self.history_text.delete(1.0, END),
-            [self.history_text.insert(END, result + "\n") for result in results]
+            self.history_text.insert(END, texto)
         ])
 
+    # Cria uma tabela rolável (usada para veículos e pontos, que podem ser centenas)
+    def criar_tabela(self, frame, titulo, colunas, linhas):
+        Label(frame, text=titulo, font=("Arial", 14, "bold"), bg="#ffffff").pack(pady=5)
+        tabela = ttk.Treeview(frame, columns=[nome for nome, _ in colunas], show="headings", height=6)
+        for nome, largura in colunas:
+            tabela.heading(nome, text=nome)
+            tabela.column(nome, width=largura, anchor="center")
+        scrollbar = Scrollbar(frame, command=tabela.yview)
+        tabela.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        tabela.pack(fill=BOTH, expand=True)
+        for iid, valores in linhas:
+            tabela.insert("", END, iid=iid, values=valores)
+        return tabela
+
     # Inicia a simulação
     def start_simulation(self):
         # Obter os valores dos parâmetros
@@ -259,55 +773,36 @@ class Interface:
             P = int(self.entry_P.get())
 
             # Validações
-            if S <= 0 or C <= 0 or A <= 0 or P <= 0:
-                raise ValueError("Todos os valores devem ser inteiros positivos.")
-
-            if A <= C:
-                raise ValueError("A capacidade A deve ser maior que o número de veículos C.")
-            if P <= A:
-                raise ValueError("O número de encomendas P deve ser maior que a capacidade A.")
+            validar_parametros(S, C, A, P)
 
             # Atualiza o CONFIG
             CONFIG["numero_pontos"] = S
             CONFIG["numero_veiculos"] = C
             CONFIG["capacidade_veiculo"] = A
             CONFIG["numero_encomendas"] = P
+            CONFIG["modo"] = self.combo_modo.get()
+            CONFIG["roteamento"] = self.combo_roteamento.get()
 
             # Criação de pasta caso não exista
-            if os.path.exists('rastros'):
-                shutil.rmtree('rastros')
-            os.makedirs('rastros')
+            preparar_diretorio_rastros(CONFIG["diretorio_rastros"])
 
             # Remove a área de entrada de parâmetros
             self.entry_S.config(state='disabled') # Impede o usuário de alterar os parâmetros após o início da simulação
             self.entry_C.config(state='disabled')
             self.entry_A.config(state='disabled')
             self.entry_P.config(state='disabled')
+            self.combo_modo.config(state='disabled')
+            self.combo_roteamento.config(state='disabled')
             self.start_button.config(state="disabled")  # Desativa o botão Iniciar Simulação
 
-            # Atualiza a interface para mostrar os veículos
-            Label(self.vehicles_frame, text="Status dos Veículos", font=("Arial", 14, "bold"), bg="#ffffff").pack(pady=5)
-
-            self.vehicle_frames = []
-            for i in range(C):
-                frame = Frame(self.vehicles_frame, bg="#ffffff", pady=2)
-                frame.pack(fill=BOTH)
-                Label(frame, text=f"Veículo {i}:", font=("Arial", 10, "bold"), bg="#ffffff").pack(side="left", padx=10)
-                label = Label(frame, text="Aguardando...", font=("Arial", 10), bg="#ffffff")
-                label.pack(side="left")
-                self.vehicle_frames.append(label)
-
-            # Atualiza a interface para mostrar os pontos
-            Label(self.points_frame, text="Status dos Pontos", font=("Arial", 14, "bold"), bg="#ffffff").pack(pady=5)
-
-            self.point_frames = []
-            for i in range(S):
-                frame = Frame(self.points_frame, bg="#ffffff", pady=2)
-                frame.pack(fill=BOTH)
-                Label(frame, text=f"Ponto {i}:", font=("Arial", 10, "bold"), bg="#ffffff").pack(side="left", padx=10)
-                label = Label(frame, text="Cargas: []", font=("Arial", 10), bg="#ffffff")
-                label.pack(side="left")
-                self.point_frames.append(label)
+            # Atualiza a interface para mostrar os veículos e os pontos (resumos, não listas de IDs)
+            self.capacidade = A
+            self.vehicle_tree = self.criar_tabela(
+                self.vehicles_frame, "Status dos Veículos", [("Veículo", 120), ("Ponto", 80), ("Carga", 100)],
+                [(i, (f"Veículo {i}", "-", "Aguardando...")) for i in range(C)])
+            self.point_tree = self.criar_tabela(
+                self.points_frame, "Status dos Pontos", [("Ponto", 120), ("Encomendas na fila", 160)],
+                [(i, (f"Ponto {i}", 0)) for i in range(S)])
 
             # Inicia a simulação em um thread separado
             # Passa a interface atual como argumento para que possa ser atualizada durante a simulação
@@ -318,83 +813,603 @@ class Interface:
         except Exception as e:
             messagebox.showerror("Erro", f"Ocorreu um erro: {str(e)}")
 
+# Gerador aleatório independente para cada parte da simulação ("encomendas", "veiculo/3", ...)
+# Com semente, cada fluxo é derivado dela e do nome, então mudar o consumo de um não altera os outros.
+def criar_rng(semente, nome):
+    return random.Random(f"{semente}/{nome}") if semente is not None else random.Random()
+
 # Função principal que organiza e executa a simulação
-def main(interface):
+# "interface" pode ser a Interface gráfica, uma InterfaceNula ou uma InterfaceLog.
+# "config" permite rodar com parâmetros próprios sem mexer no CONFIG global.
+# "metricas" recebe as métricas da execução (se não for informado, uma instância nova é criada).
+def main(interface, config=None, metricas=None):
+    config = CONFIG if config is None else config
 
-    S = CONFIG["numero_pontos"]  # Número de pontos de redistribuição
-    C = CONFIG["numero_veiculos"]  # Número de veículos
-    P = CONFIG["numero_encomendas"]  # Número de encomendas
-    A = CONFIG["capacidade_veiculo"]  # Capacidade de cada veículo
+    S = config["numero_pontos"]  # Número de pontos de redistribuição
+    C = config["numero_veiculos"]  # Número de veículos
+    P = config["numero_encomendas"]  # Número de encomendas
+    A = config["capacidade_veiculo"]  # Capacidade de cada veículo
+    semente = config.get("semente")  # Mesma semente, mesma sequência de origens, destinos e tempos
+    rastros = EscritorRastros(config.get("diretorio_rastros", "rastros"), config.get("formato_rastros", "texto"))  # Grava os rastros em lotes em um thread separado
 
-    # Cria os pontos
-    pontos = [Ponto(i) for i in range(S)]
-    lock_pontos = [threading.Lock() for _ in range(S)]  # Cria uma lista de locks (threading.Lock) para garantir que apenas um veículo acesse um ponto de redistribuição por vez
+    # No modo "eventos" nenhum thread é criado: um único SimuladorEventos conduz os veículos pelo relógio virtual
+    simulador = SimuladorEventos(config.get("inicio_relogio")) if config.get("modo") == "eventos" else None
+    relogio = simulador.relogio if simulador else time.time
+    inicio_parede = time.perf_counter()
+    inicio = relogio()
+    aberto = bool(config.get("chegadas"))  # Sistema aberto: as encomendas chegam ao longo do tempo
+    if metricas is None:
+        metricas = Metricas()
+    metricas.inicio = inicio
+    if aberto:
+        # Execuções longas: só as amostras de fila mais recentes e uma janela deslizante de entregas ficam na memória
+        metricas.max_amostras = config.get("max_amostras", 1000)
+        if metricas.janela is None:
+            metricas.janela = JanelaDeslizante(config.get("largura_janela", 60.0))
 
-    # Inicia os threads dos pontos
-    for ponto in pontos:
-        ponto.start()
+    # Registro de eventos para reprodução exata (opcional)
+    registro = RegistroEventos(config["registro_eventos"]) if config.get("registro_eventos") else None
+    if registro is not None:
+        registro.inicio({chave: config.get(chave) for chave in ("numero_pontos", "numero_veiculos", "capacidade_veiculo",
+                                                                 "numero_encomendas", "modo", "semente", "roteamento", "topologia",
+                                                                 "chegadas", "docas")}, inicio)
 
-    encomendas_restantes = [P]  # Contador global de encomendas pendentes
-    monitoramento_lock = threading.Lock()  # Um lock para evitar condições de corrida durante a atualização do contador de encomendas pendentes
+    topologia = criar_topologia(config)
+    pontos = criar_pontos(config, topologia, metricas)
 
-    # Cria os veículos
-    veiculos = [Veiculo(i, pontos, A, lock_pontos, encomendas_restantes, monitoramento_lock, interface) for i in range(C)]
-    for veiculo in veiculos:
-        veiculo.start()
+    encomendas_restantes = [1 if aberto else P]  # Contador global de encomendas pendentes (no sistema aberto, a reserva do injetor)
+    monitoramento_lock = criar_monitoramento_lock(config, metricas)  # Um lock para evitar condições de corrida durante a atualização do contador de encomendas pendentes
+
+    # Cria os veículos (todos compartilham a mesma política de rota; cada um tem seu gerador aleatório)
+    roteamento = criar_roteamento(config.get("roteamento", "ciclico"), S, topologia.tempo if topologia else None)
+    armazem = ArmazemEncomendas(rastros, reutilizar=aberto)  # Estado das encomendas em colunas; pontos e veículos guardam só índices
+    veiculos = [Veiculo(i, pontos, armazem, A, encomendas_restantes, monitoramento_lock, interface, relogio, roteamento, topologia, metricas,
+                        criar_rng(semente, f"veiculo/{i}"), registro) for i in range(C)]
+    if registro is not None:
+        for veiculo in veiculos:
+            registro.veiculo(veiculo.id, veiculo.local_atual)
+
+    if aberto:
+        return executar_processos(interface, config, metricas, rastros, simulador, relogio, inicio, inicio_parede, pontos, armazem,
+                                  veiculos, encomendas_restantes, monitoramento_lock, roteamento, registro)
 
     # Cria as encomendas
-    encomendas = []
+    rng = criar_rng(semente, "encomendas")
     # Distribui as primeiras encomendas de forma que cada veículo tenha pelo menos uma encomenda para carregar
     for i, veiculo in enumerate(veiculos):
         origem = veiculo.local_atual  # Garante que o veículo encontre uma encomenda em seu local atual
-        destino = random.randint(0, S - 1) # O destino é gerado aleatoriamente, mas diferente da origem
+        destino = rng.randint(0, S - 1) # O destino é gerado aleatoriamente, mas diferente da origem
         while destino == origem:
-            destino = random.randint(0, S - 1)
-        encomenda = Encomenda(i, origem, destino, pontos, interface)
-        encomendas.append(encomenda)
-        encomenda.start() # Inicia os threads das encomendas
+            destino = rng.randint(0, S - 1)
+        armazem.criar(i, origem, destino, relogio())
 
     # Cria as demais encomendas (de C até P-1)
     for i in range(C, P):
-        origem = random.randint(0, S - 1)
-        destino = random.randint(0, S - 1)
+        origem = rng.randint(0, S - 1)
+        destino = rng.randint(0, S - 1)
         while destino == origem:
-            destino = random.randint(0, S - 1)
-        encomenda = Encomenda(i, origem, destino, pontos, interface)
-        encomendas.append(encomenda)
-        encomenda.start()
+            destino = rng.randint(0, S - 1)
+        armazem.criar(i, origem, destino, relogio())
 
-    # Espera que todos os threads de encomendas sejam concluídos
-    for encomenda in encomendas:
-        encomenda.join()
+    # As encomendas entram nas filas dos pontos de origem; daí em diante só os veículos agem sobre elas
+    for encomenda in range(len(armazem)):
+        origem = armazem.origem[encomenda]
+        pontos[origem].enqueue_encomenda(encomenda)
+        interface.update_point(origem, pontos[origem].tamanho_fila())
+        if registro is not None:
+            registro.encomenda(armazem.horario_criacao[encomenda], armazem.ids[encomenda], origem, armazem.destino[encomenda])
+    for ponto in pontos:
+        metricas.registrar_fila(ponto.id, relogio(), ponto.tamanho_fila())
 
-    # Espera que todos os threads dos veículos sejam encerrados
-    for veiculo in veiculos:
-        veiculo.join()
+    return executar_processos(interface, config, metricas, rastros, simulador, relogio, inicio, inicio_parede, pontos, armazem,
+                              veiculos, encomendas_restantes, monitoramento_lock, roteamento, registro)
 
-    # Finaliza os threads dos pontos
-    for ponto in pontos:
-        ponto.running = False
+# Topologia da rede (opcional): define os tempos de viagem entre os pontos
+def criar_topologia(config):
+    S = config["numero_pontos"]
+    if config.get("topologia") == "aleatoria":
+        return Topologia.aleatoria(S, rng=criar_rng(config.get("semente"), "topologia"))
+    if config.get("topologia"):
+        topologia = carregar_topologia(config["topologia"])
+        if topologia.numero_pontos != S:
+            raise ValueError(f"A topologia tem {topologia.numero_pontos} pontos, mas S = {S}.")
+        return topologia
+    return None
+
+# Cria os pontos, com as coordenadas da topologia (se houver)
+def criar_pontos(config, topologia, metricas):
+    S = config["numero_pontos"]
+    coordenadas = topologia.coordenadas if topologia and topologia.coordenadas else [None] * S
+    pontos = [Ponto(i, coordenadas[i], config.get("docas")) for i in range(S)]
+    if config.get("medir_locks"):  # Opcional: medir custa um contador por aquisição
+        for ponto in pontos:
+            ponto.fila_lock = metricas.medir_lock(ponto.fila_lock, "pontos")  # Mede o tempo de espera pelos locks das filas
+    return pontos
+
+def criar_monitoramento_lock(config, metricas):
+    lock = threading.Lock()
+    return metricas.medir_lock(lock, "monitoramento") if config.get("medir_locks") else lock
+
+# Ao retomar um instantâneo, mantém no relatório de janelas só as linhas com "tempo" até "captura" e antes de
+# "proximo"; as gravadas pela execução original depois do instantâneo, e uma linha incompleta no fim, são
+# descartadas, já que a execução retomada volta a gravá-las.
+def truncar_relatorio_janelas(caminho, captura, proximo):
+    try:
+        with open(caminho) as arquivo:
+            linhas = [(linha, json.loads(linha)["tempo"]) for linha in arquivo if linha.endswith("\n")]
+    except FileNotFoundError:  # Novo arquivo de relatório: nada a descartar
+        return
+    linhas = [linha for linha, tempo in linhas if tempo <= captura and tempo < proximo]
+    with open(caminho, "w") as arquivo:
+        arquivo.writelines(linhas)
+
+# Conduz os processos da execução (veículos e, no sistema aberto, injetor e relatório) até o fim e encerra a execução
+# Sistema aberto: um InjetorEncomendas cria as encomendas ao longo do tempo e um RelatorioJanelas
+# acompanha a vazão e a latência recentes. O armazém reaproveita os índices das encomendas entregues e o
+# histórico dos veículos é limitado, então a memória não cresce com a duração da execução.
+# Com "instantaneo" (estado carregado por retomar), injetor e relatório continuam de onde pararam e cada processo
+# ainda ativo volta a agir no horário guardado, na mesma ordem; veículos que não estavam no instantâneo começam agora.
+def executar_processos(interface, config, metricas, rastros, simulador, relogio, inicio, inicio_parede, pontos, armazem,
+                       veiculos, encomendas_restantes, monitoramento_lock, roteamento, registro, instantaneo=None):
+    aberto = bool(config.get("chegadas"))
+    processos = {}  # chave -> processo, na ordem em que são agendados
+    injetor = relatorio = arquivo = None
+    if aberto:
+        processo = criar_processo_chegadas(config, len(pontos), criar_rng(config.get("semente"), "chegadas"))
+        injetor = InjetorEncomendas(processo, pontos, armazem, encomendas_restantes, monitoramento_lock, interface, relogio,
+                                    config.get("numero_encomendas"), config.get("duracao"), metricas, registro)
+        destino_relatorio = config.get("relatorio_janelas")
+        modo_arquivo = "w" if instantaneo is None else "a"  # Ao retomar, os relatórios continuam no mesmo arquivo
+        if instantaneo is not None and destino_relatorio and destino_relatorio != "-":
+            # Só ficam os relatórios gravados antes da captura (até "agora") e que a retomada não grava de novo (antes do
+            # próximo horário do relatório); no modo threads o último relatório sai antes do horário, ao fim da execução
+            proximo = dict(instantaneo["agenda"]).get("relatorio", float("inf"))
+            inicio_relatorio = instantaneo["relatorio"]["inicio"]
+            truncar_relatorio_janelas(destino_relatorio, instantaneo["agora"] - inicio_relatorio, proximo - inicio_relatorio)
+        arquivo = sys.stderr if destino_relatorio == "-" else open(destino_relatorio, modo_arquivo) if destino_relatorio else None
+        relatorio = RelatorioJanelas(metricas, config.get("intervalo_relatorio", 10.0), encomendas_restantes, monitoramento_lock,
+                                     interface, relogio, arquivo)
+        processos["injetor"], processos["relatorio"] = injetor, relatorio
+        if instantaneo is None:
+            for veiculo in veiculos:
+                veiculo.historico = HistoricoVeiculo(config.get("max_historico", 1000))  # Só as ações mais recentes
+        else:
+            injetor.restaurar(instantaneo["injetor"])
+            relatorio.restaurar(instantaneo["relatorio"])
+    processos.update((f"veiculo/{veiculo.id}", veiculo) for veiculo in veiculos)
+
+    if instantaneo is not None:
+        conhecidos = {f"veiculo/{estado['id']}" for estado in instantaneo["veiculos"]} | {"injetor", "relatorio"}
+        retomados = {}
+        for chave, retomada in instantaneo["agenda"]:
+            if chave in processos:  # Processos que já tinham terminado ou veículos retirados da frota ficam de fora
+                processos[chave].retomada = retomada
+                retomados[chave] = processos[chave]
+        retomados.update((chave, processo) for chave, processo in processos.items() if chave not in conhecidos)
+        processos = retomados
+
+    instantaneos = None
+    if config.get("instantaneo"):
+        instantaneos = Instantaneos(config["instantaneo"], config.get("intervalo_instantaneo", 60.0), config, simulador, relogio,
+                                    inicio, pontos, armazem, veiculos, injetor, relatorio, encomendas_restantes, metricas,
+                                    roteamento, processos, interface)
+
+    sinais = {}
+    if aberto and threading.current_thread() is threading.main_thread():
+        # SIGINT/SIGTERM encerram as chegadas e a execução termina com o resumo de sempre; um segundo sinal interrompe de vez
+        def encerrar_chegadas(sinal, quadro):
+            signal.signal(sinal, sinais[sinal])
+            interface.update_status("Sinal recebido: chegadas encerradas, entregando as encomendas já geradas.")
+            injetor.parar.set()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            sinais[sinal] = signal.signal(sinal, encerrar_chegadas)
+
+    try:
+        if simulador is None:
+            for processo in processos.values():
+                processo.start()
+            if instantaneos is not None:
+                instantaneos.start()
+            # Espera que todos os processos terminem (todas as encomendas foram entregues); o relatório por último
+            for processo in processos.values():
+                if processo is not relatorio:
+                    processo.join()
+            if "relatorio" in processos:
+                relatorio.parar.set()  # Emite o último relatório sem esperar o intervalo
+                relatorio.join()
+            if injetor is not None and injetor.erro is not None:
+                raise injetor.erro
+        else:
+            # Os processos viram processos do simulador
+            for chave, processo in processos.items():
+                passos = processo.passos or processo.ciclo()
+                simulador.agendar_em(passos, processo.retomada)
+                if instantaneos is not None:
+                    instantaneos.chaves[passos] = chave
+            if instantaneos is not None:
+                simulador.executar(instantaneos.capturar, instantaneos.intervalo)
+            else:
+                simulador.executar()
+    finally:
+        for sinal, anterior in sinais.items():
+            signal.signal(sinal, anterior)
+        if instantaneos is not None:
+            instantaneos.parar.set()
+            if instantaneos.is_alive():
+                instantaneos.join()
+            instantaneos.fechar()
+        if arquivo is not None and arquivo is not sys.stderr:
+            arquivo.close()
+
+    fim = relogio()  # O mesmo horário no registro e no resumo, para a reprodução chegar ao mesmo fim
+    if registro is not None:
+        registro.fechar(fim, simulador.eventos_processados if simulador else None)
+    return encerrar_execucao(interface, config, metricas, rastros, fim, veiculos, None if aberto else armazem, inicio, inicio_parede,
+                             roteamento.nome, simulador.eventos_processados if simulador else None, injetor.geradas if aberto else None)
+
+# Retoma uma execução a partir de um instantâneo gravado com CONFIG["instantaneo"]
+# Pontos, armazém, veículos, métricas e (no sistema aberto) injetor e relatório voltam ao estado capturado e cada
+# processo volta a agir no horário guardado, então no modo eventos, com a mesma configuração, o resultado é o mesmo
+# da execução sem interrupção. No modo threads o relógio continua do horário do instantâneo.
+# "config" troca a saída (diretorio_rastros, formato_rastros, metricas_*, instantaneo) e, para comparar cenários,
+# pode trocar "roteamento" e "numero_veiculos": veículos a mais começam vazios em um ponto sorteado e os retirados
+# da frota deixam a carga na fila do ponto em que estavam.
+# O relatório de janelas não é herdado da execução original: só é gravado se "config" trouxer "relatorio_janelas",
+# então uma retomada (talvez um cenário diferente) nunca trunca nem acrescenta linhas ao arquivo da original.
+# No sistema fechado os rastros das encomendas entregues antes do instantâneo são regravados, então a nova pasta
+# de rastros fica completa; no aberto (índices reaproveitados) ela só tem as entregas feitas depois.
+def retomar(caminho, interface, config=None, metricas=None):
+    instantaneo = carregar_instantaneo(caminho)
+    original = instantaneo["config"]
+    config = {**original, "registro_eventos": None, "relatorio_janelas": None, **(config or {})}
+    if config.get("registro_eventos"):
+        raise ValueError("O registro de eventos precisa da execução desde o início e não pode ser gravado ao retomar um instantâneo.")
+    S, C, A = config["numero_pontos"], config["numero_veiculos"], config["capacidade_veiculo"]
+    aberto = bool(config.get("chegadas"))
+    validar_parametros(S, C, A, config["numero_encomendas"], aberto)
+    semente = config.get("semente")
+
+    agora = instantaneo["agora"]
+    if config.get("modo") == "eventos":
+        simulador = SimuladorEventos(agora)
+        simulador.eventos_processados = instantaneo["eventos_processados"] or 0
+        relogio = simulador.relogio
+    else:
+        simulador = None
+        deslocamento = time.time() - agora
+
+        def relogio():  # Relógio real deslocado para continuar do horário do instantâneo
+            return time.time() - deslocamento
+    inicio = instantaneo["inicio"]
+    inicio_parede = time.perf_counter()
+    rastros = EscritorRastros(config.get("diretorio_rastros", "rastros"), config.get("formato_rastros", "texto"))
+    if metricas is None:
+        metricas = Metricas()
+    metricas.restaurar(instantaneo["metricas"])
+
+    topologia = criar_topologia(config)
+    pontos = criar_pontos(config, topologia, metricas)
+    for ponto, fila in zip(pontos, instantaneo["pontos"]):
+        ponto.fila_encomendas.extend(fila)
+    encomendas_restantes = [instantaneo["encomendas_restantes"]]
+    monitoramento_lock = criar_monitoramento_lock(config, metricas)
+    roteamento = criar_roteamento(config.get("roteamento", "ciclico"), S, topologia.tempo if topologia else None)
+    if roteamento.nome == original.get("roteamento", "ciclico"):
+        roteamento.restaurar(instantaneo["roteamento"])
+
+    armazem = ArmazemEncomendas.restaurar(instantaneo["armazem"], rastros)
+    if not aberto:
+        entregues = [encomenda for encomenda in range(len(armazem)) if armazem.situacao(encomenda) == ENTREGUE]
+        for encomenda in sorted(entregues, key=armazem.horario_descarregado.__getitem__):  # Na ordem de entrega
+            rastros.registrar(armazem.registro(encomenda))
+
+    estados = {estado["id"]: estado for estado in instantaneo["veiculos"]}
+    veiculos = []
+    for i in range(C):
+        veiculo = Veiculo(i, pontos, armazem, A, encomendas_restantes, monitoramento_lock, interface, relogio, roteamento, topologia,
+                          metricas, criar_rng(semente, f"veiculo/{i}"))
+        if i in estados:
+            veiculo.restaurar(estados[i])
+        elif aberto:
+            veiculo.historico = HistoricoVeiculo(config.get("max_historico", 1000))
+        veiculos.append(veiculo)
+    for veiculo_id in sorted(estados):
+        if veiculo_id >= C:  # Veículo retirado da frota: a carga volta para a fila do ponto em que ele estava
+            ponto = pontos[estados[veiculo_id]["local_atual"]]
+            for _, fila in estados[veiculo_id]["carga"]:
+                for encomenda in fila:
+                    armazem.devolver(encomenda)
+                    ponto.enqueue_encomenda(encomenda)
+            metricas.registrar_fila(ponto.id, relogio(), ponto.tamanho_fila())
     for ponto in pontos:
-        ponto.join()
+        interface.update_point(ponto.id, ponto.tamanho_fila())
+    interface.update_status(f"Execução retomada do instantâneo {caminho}.")
+
+    return executar_processos(interface, config, metricas, rastros, simulador, relogio, inicio, inicio_parede, pontos, armazem,
+                              veiculos, encomendas_restantes, monitoramento_lock, roteamento, None, instantaneo)
+
+# Reproduz uma execução a partir do registro de eventos gravado com CONFIG["registro_eventos"]
+# Os eventos são reaplicados, na ordem gravada, a pontos, veículos e encomendas novos com o relógio
+# ajustado para o horário de cada evento, então rastros, histórico e resumo saem idênticos aos da
+# execução original (inclusive de uma execução com threads): a ocupação soma os atrasos gravados na mesma
+# ordem que o veículo somou e eventos_processados vem do evento "fim". "config" só define a saída
+# (diretorio_rastros, formato_rastros, metricas_*).
+def reproduzir(caminho, interface, config=None, metricas=None):
+    eventos = ler_eventos(caminho)
+    if not eventos or eventos[0][0] != "inicio":
+        raise ValueError(f"Registro de eventos inválido: {caminho}")
+    original, inicio = eventos[0][1], eventos[0][2]
+    config = dict(original, **(config or {}))
+    S, C, A = config["numero_pontos"], config["numero_veiculos"], config["capacidade_veiculo"]
+
+    relogio_virtual = SimuladorEventos(inicio)
+    relogio = relogio_virtual.relogio
+    rastros = EscritorRastros(config.get("diretorio_rastros", "rastros"), config.get("formato_rastros", "texto"))
+    if metricas is None:
+        metricas = Metricas()
+    metricas.inicio = inicio
+    inicio_parede = time.perf_counter()
+
+    pontos = [Ponto(i) for i in range(S)]
+    armazem = ArmazemEncomendas(rastros)
+    veiculos = {}
+    eventos_processados = None
+    for evento in eventos[1:]:
+        tipo = evento[0]
+        if tipo == "veiculo":
+            _, veiculo_id, local_inicial = evento
+            veiculo = Veiculo(veiculo_id, pontos, armazem, A, [0], threading.Lock(), interface, relogio)
+            veiculo.local_atual = local_inicial
+            veiculos[veiculo_id] = veiculo
+            continue
+        horario = evento[1]
+        relogio_virtual.agora = horario
+        if tipo == "encomenda":
+            _, _, encomenda_id, origem, destino = evento
+            pontos[origem].enqueue_encomenda(armazem.criar(encomenda_id, origem, destino, horario))
+            interface.update_point(origem, pontos[origem].tamanho_fila())
+            metricas.registrar_fila(origem, horario, pontos[origem].tamanho_fila())
+            continue
+        if tipo == "fim":
+            eventos_processados = evento[2]
+            break
+
+        veiculo_id, ponto_id, outro = evento[2:5]
+        veiculo = veiculos[veiculo_id]
+        if tipo == "carga":
+            encomenda = pontos[ponto_id].get_encomenda()
+            if encomenda is None or armazem.ids[encomenda] != outro:
+                raise ValueError(f"Registro inconsistente: encomenda {outro} não é a próxima da fila do ponto {ponto_id}.")
+            armazem.carregar(encomenda, veiculo_id, horario)
+            veiculo.carga.adicionar(encomenda, armazem.destino[encomenda])
+            veiculo.historico.registrar(CARREGOU, outro, ponto_id)
+            metricas.registrar_carga(veiculo_id, armazem.horario_criacao[encomenda], horario)
+            metricas.registrar_fila(ponto_id, horario, pontos[ponto_id].tamanho_fila())
+        elif tipo == "entrega":
+            veiculo.carga_tempo += len(veiculo.carga) * evento[5]  # Como em descarregar: antes de retirar a encomenda
+            encomenda = veiculo.carga.retirar(ponto_id)
+            if armazem.ids[encomenda] != outro:
+                raise ValueError(f"Registro inconsistente: encomenda {outro} não é a próxima a descarregar no ponto {ponto_id}.")
+            armazem.entregar(encomenda, horario)
+            veiculo.historico.registrar(ENTREGOU, outro, ponto_id)
+            metricas.registrar_entrega(veiculo_id, armazem.horario_criacao[encomenda], armazem.horario_carregado[encomenda], horario)
+        elif tipo == "viagem":
+            veiculo.local_atual = outro
+            veiculo.carga_tempo += len(veiculo.carga) * evento[5]
 
-    # Gera o histórico final
-    results = []
+    return encerrar_execucao(interface, config, metricas, rastros, relogio(), list(veiculos.values()), armazem, inicio,
+                             inicio_parede, config.get("roteamento", "ciclico"), eventos_processados, len(armazem))
+
+# Linhas do histórico final, geradas sob demanda: só uma interface que exibe o histórico paga pela formatação
+def linhas_historico(veiculos, armazem):
     for veiculo in veiculos:
-        results.append(f"Veículo {veiculo.id}:")
-        results.extend(veiculo.historico)
-        results.append("")
-
-    for encomenda in encomendas:
-        results.append(
-            f"Encomenda {encomenda.id} - Origem: {encomenda.origem}, Destino: {encomenda.destino}, "
-            f"Carregada: {time.strftime('%H:%M:%S', time.localtime(encomenda.horario_carregado))}, Entregue: {time.strftime('%H:%M:%S', time.localtime(encomenda.horario_descarregado))}"
-        )
-    interface.display_results(results)  # Exibe o histórico final
+        yield f"Veículo {veiculo.id}:"
+        yield from veiculo.historico.linhas()
+        yield ""
+
+    if armazem is not None:
+        for id, origem, destino, _, carregado, descarregado, _ in map(armazem.registro, range(len(armazem))):
+            yield (
+                f"Encomenda {id} - Origem: {origem}, Destino: {destino}, "
+                f"Carregada: {time.strftime('%H:%M:%S', time.localtime(carregado))}, Entregue: {time.strftime('%H:%M:%S', time.localtime(descarregado))}"
+            )
+
+# Fecha os rastros, exporta as métricas, mostra o histórico e monta o resumo da execução
+# No sistema aberto "armazem" é None (os índices foram reaproveitados): entregas e latências vêm das métricas
+# e "geradas" é o total de encomendas criadas.
+def encerrar_execucao(interface, config, metricas, rastros, fim, veiculos, armazem, inicio, inicio_parede, roteamento, eventos_processados, geradas=None):
+    A = config["capacidade_veiculo"]
+    rastros.fechar()  # Espera a gravação dos últimos lotes
+    metricas.finalizar(fim, veiculos)
+    if config.get("metricas_prometheus"):
+        metricas.salvar_prometheus(config["metricas_prometheus"])
+    if config.get("metricas_csv"):
+        metricas.salvar_csv(config["metricas_csv"])
+    if config.get("metricas_series_csv"):
+        metricas.salvar_series_csv(config["metricas_series_csv"])
+
+    interface.display_results(linhas_historico(veiculos, armazem))  # Exibe o histórico final
     interface.update_status("Simulação concluída!")  # Atualiza o status final
 
+    # Métricas da execução
+    if armazem is not None:
+        entregues, makespan, latencias = armazem.resumo(inicio)  # Makespan: tempo simulado até a última entrega; latência: da criação até a entrega
+        latencia_media = sum(latencias) / len(latencias) if latencias else None
+    else:
+        entregues = metricas.latencia.quantidade
+        makespan = metricas.ultima_entrega - inicio if entregues else 0.0
+        latencias = sorted(metricas.amostra_latencias.valores)  # Amostra uniforme das latências (p95 aproximado em execuções longas)
+        latencia_media = metricas.latencia.media() if entregues else None
+    utilizacao = [v.carga_tempo / (A * makespan) if makespan > 0 else 0.0 for v in veiculos]  # Ocupação média da capacidade
+
+    # Resumo da execução (usado pela linha de comando e pelas execuções em lote)
+    return {
+        "numero_pontos": config["numero_pontos"],
+        "numero_veiculos": config["numero_veiculos"],
+        "capacidade_veiculo": A,
+        "numero_encomendas": config["numero_encomendas"] if geradas is None else geradas,
+        "modo": config.get("modo", "threads"),
+        "semente": config.get("semente"),
+        "diretorio_rastros": rastros.diretorio,
+        "formato_rastros": rastros.formato,
+        "roteamento": roteamento,
+        "topologia": config.get("topologia"),
+        "chegadas": config.get("chegadas"),
+        "encomendas_entregues": entregues,
+        "makespan": makespan,
+        "latencia_media": latencia_media,
+        "latencia_p95": percentil(latencias, 95),
+        "utilizacao_veiculos": sum(utilizacao) / len(utilizacao),
+        "tempo_execucao": time.perf_counter() - inicio_parede,  # Tempo real gasto na execução
+        "eventos_processados": eventos_processados,
+    }
+
+# Percentil pelo método do posto mais próximo (valores já ordenados)
+def percentil(valores, p):
+    if not valores:
+        return None
+    indice = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores))) - 1))
+    return valores[indice]
+
+# Execução sem interface gráfica: python simulacao_logistica.py -S 5 -C 2 -A 5 -P 15 --semente 42 --saida rastros
+# Reprodução de um registro de eventos: python simulacao_logistica.py --reproduzir eventos.jsonl --saida rastros
+# Retomada de um instantâneo: python simulacao_logistica.py --retomar estado.inst --saida rastros [-C 4] [--roteamento tsp]
+# Imprime um resumo em JSON na saída padrão
+def executar_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação de logística sem interface gráfica.")
+    parser.add_argument("-S", type=int, help="Número de pontos de redistribuição")
+    parser.add_argument("-C", type=int, help="Número de veículos")
+    parser.add_argument("-A", type=int, help="Capacidade de carga de cada veículo")
+    parser.add_argument("-P", type=int, help="Número total de encomendas (com --chegadas, limite opcional de encomendas geradas)")
+    parser.add_argument("--semente", type=int, default=None, help="Semente dos geradores aleatórios")
+    parser.add_argument("--inicio-relogio", type=float, default=None, help="Horário inicial (epoch) do relógio virtual no modo eventos")
+    parser.add_argument("--registrar-eventos", default=None, help="Grava o registro de eventos da execução neste arquivo")
+    parser.add_argument("--reproduzir", default=None, help="Reproduz o registro de eventos deste arquivo (ignora -S, -C, -A, -P)")
+    parser.add_argument("--instantaneo", default=None, help="Grava instantâneos periódicos do estado da execução neste arquivo")
+    parser.add_argument("--intervalo-instantaneo", type=float, default=60.0,
+                        help="Segundos entre instantâneos (simulados no modo eventos, reais no modo threads; padrão: 60)")
+    parser.add_argument("--retomar", default=None, help="Retoma a execução do instantâneo deste arquivo (aceita -C e --roteamento para comparar cenários)")
+    parser.add_argument("--saida", default="rastros", help="Pasta dos arquivos de rastro (apagada e recriada)")
+    parser.add_argument("--modo", choices=["eventos", "threads"], default=None, help="Motor de execução (padrão: eventos)")
+    parser.add_argument("--formato-rastros", choices=FORMATOS_RASTRO, default="jsonl", help="Formato dos rastros (padrão: jsonl)")
+    parser.add_argument("--roteamento", choices=list(ROTEAMENTOS), default=None, help="Política de rota dos veículos (padrão: ciclico)")
+    parser.add_argument("--docas", type=int, default=None, help="Veículos que podem carregar/descarregar ao mesmo tempo em cada ponto (padrão: sem limite)")
+    parser.add_argument("--topologia", default=None, help="'aleatoria' ou arquivo de topologia (padrão: tempo de viagem aleatório)")
+    parser.add_argument("--medir-locks", action="store_true", help="Mede a espera pelos locks das filas e do contador de encomendas")
+    parser.add_argument("--metricas-prometheus", default=None, help="Grava as métricas da execução neste arquivo (formato Prometheus)")
+    parser.add_argument("--metricas-csv", default=None, help="Grava as métricas da execução neste arquivo CSV")
+    parser.add_argument("--metricas-series-csv", default=None, help="Grava as amostras do tamanho das filas neste arquivo CSV")
+    parser.add_argument("--chegadas", default=None, help="Sistema aberto: 'poisson', 'rajadas' ou registro de pedidos (.csv/.jsonl)")
+    parser.add_argument("--taxa", type=float, default=1.0, help="Encomendas por segundo (padrão: 1)")
+    parser.add_argument("--taxa-rajada", type=float, default=10.0, help="Encomendas por segundo durante as rajadas (padrão: 10)")
+    parser.add_argument("--duracao-rajada", type=float, default=10.0, help="Duração de cada rajada em segundos (padrão: 10)")
+    parser.add_argument("--periodo-rajada", type=float, default=60.0, help="Intervalo entre o início das rajadas em segundos (padrão: 60)")
+    parser.add_argument("--duracao", type=float, default=None, help="Segundos simulados em que chegam encomendas")
+    parser.add_argument("--janela", type=float, default=60.0, help="Largura da janela deslizante de vazão e latência em segundos (padrão: 60)")
+    parser.add_argument("--intervalo-relatorio", type=float, default=10.0, help="Segundos simulados entre relatórios da janela (padrão: 10)")
+    parser.add_argument("--relatorio-janelas", default=None, help="Grava os relatórios da janela neste arquivo JSON Lines ('-' = stderr)")
+    parser.add_argument("--log", action="store_true", help="Registra os eventos no stderr em vez de descartá-los")
+    args = parser.parse_args(argv)
+
+    saida = {
+        "diretorio_rastros": args.saida,
+        "formato_rastros": args.formato_rastros,
+        "metricas_prometheus": args.metricas_prometheus,
+        "metricas_csv": args.metricas_csv,
+        "metricas_series_csv": args.metricas_series_csv,
+        "instantaneo": args.instantaneo,
+        "intervalo_instantaneo": args.intervalo_instantaneo,
+    }
+    if args.log:
+        logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(message)s")
+        interface = InterfaceLog()
+    else:
+        interface = InterfaceNula()
+
+    if args.reproduzir:
+        if dentro_do_diretorio(args.reproduzir, args.saida):
+            parser.error(f"O registro {args.reproduzir} está dentro de --saida {args.saida}, que é apagada antes da execução; use outra pasta de saída.")
+        preparar_diretorio_rastros(args.saida)
+        try:
+            resumo = reproduzir(args.reproduzir, interface, saida)
+        except (ValueError, OSError) as e:
+            parser.error(str(e))
+        print(json.dumps(resumo, ensure_ascii=False))
+        return 0 if resumo["encomendas_entregues"] == resumo["numero_encomendas"] else 1
+
+    if args.intervalo_instantaneo <= 0:
+        parser.error("--intervalo-instantaneo deve ser positivo.")
+    if args.retomar:
+        if args.registrar_eventos:
+            parser.error("--registrar-eventos não pode ser usado com --retomar (o registro precisa da execução desde o início).")
+        if dentro_do_diretorio(args.retomar, args.saida):
+            parser.error(f"O instantâneo {args.retomar} está dentro de --saida {args.saida}, que é apagada antes da execução; use outra pasta de saída.")
+        cenario = {"numero_veiculos": args.C, "roteamento": args.roteamento, "modo": args.modo, "relatorio_janelas": args.relatorio_janelas}
+        preparar_diretorio_rastros(args.saida)
+        try:
+            resumo = retomar(args.retomar, interface, {**saida, **{chave: valor for chave, valor in cenario.items() if valor is not None}})
+        except (ValueError, OSError) as e:
+            parser.error(str(e))
+        print(json.dumps(resumo, ensure_ascii=False))
+        return 0 if resumo["encomendas_entregues"] == resumo["numero_encomendas"] else 1
+
+    if args.chegadas:
+        if None in (args.S, args.C, args.A):
+            parser.error("-S, -C e -A são obrigatórios.")
+        if args.P is None and args.duracao is None and args.chegadas in ("poisson", "rajadas"):
+            print("Chegadas sem fim (sem -P nem --duracao): Ctrl+C ou SIGTERM encerra as chegadas e imprime o resumo.", file=sys.stderr)
+        if args.janela <= 0 or args.intervalo_relatorio <= 0:
+            parser.error("--janela e --intervalo-relatorio devem ser positivos.")
+    elif None in (args.S, args.C, args.A, args.P):
+        parser.error("-S, -C, -A e -P são obrigatórios (exceto com --reproduzir e --retomar).")
+    if args.docas is not None and args.docas <= 0:
+        parser.error("--docas deve ser positivo.")
+    try:
+        validar_parametros(args.S, args.C, args.A, args.P, aberto=bool(args.chegadas))
+    except ValueError as ve:
+        parser.error(str(ve))
+
+    config = {
+        "numero_pontos": args.S,
+        "numero_veiculos": args.C,
+        "capacidade_veiculo": args.A,
+        "numero_encomendas": args.P,
+        "modo": args.modo or "eventos",
+        "semente": args.semente,
+        "inicio_relogio": args.inicio_relogio,
+        "registro_eventos": args.registrar_eventos,
+        "roteamento": args.roteamento or "ciclico",
+        "docas": args.docas,
+        "medir_locks": args.medir_locks,
+        "topologia": args.topologia,
+        "chegadas": args.chegadas,
+        "taxa_chegadas": args.taxa,
+        "taxa_rajada": args.taxa_rajada,
+        "duracao_rajada": args.duracao_rajada,
+        "periodo_rajada": args.periodo_rajada,
+        "duracao": args.duracao,
+        "largura_janela": args.janela,
+        "intervalo_relatorio": args.intervalo_relatorio,
+        "relatorio_janelas": args.relatorio_janelas,
+        **saida,
+    }
+
+    preparar_diretorio_rastros(args.saida)
+    try:
+        resumo = main(interface, config)
+    except (ValueError, OSError) as e:  # Ex.: arquivo de topologia inexistente ou com outro número de pontos
+        parser.error(str(e))
+    print(json.dumps(resumo, ensure_ascii=False))
+    return 0 if resumo["encomendas_entregues"] == resumo["numero_encomendas"] else 1
+
 # Execução do programa
 if __name__ == "__main__":
+    if len(sys.argv) > 1:  # Com parâmetros na linha de comando, roda sem interface gráfica
+        sys.exit(executar_cli())
+    if Tk is None:  # Sem Tkinter só resta a linha de comando
+        sys.exit("Tkinter não está disponível, então a interface gráfica não pode ser aberta.\n"
+                 "Rode pela linha de comando, por exemplo: python simulacao_logistica.py -S 5 -C 2 -A 5 -P 15\n"
+                 "(python simulacao_logistica.py --help lista as opções)")
     root = Tk() # Criação da Interface Gráfica
     app = Interface(root)  # Inicialização da Interface
     root.mainloop() # Inicia o loop principal da interface gráfica
@@ -0,0 +1,177 @@
+# Topologia da rede de entrega e matriz de tempos de viagem
+# A rede pode vir de coordenadas (grafo completo, tempo = distância euclidiana / velocidade)
+# ou de um arquivo de arestas com pesos (tempo = caminho mínimo). Em ambos os casos os tempos
+# entre todos os pares de pontos são calculados uma única vez e guardados em uma matriz
+# compacta (float32), então cada consulta feita por um veículo é O(1).
+# O NumPy é opcional: sem ele a matriz fica em um array('f') plano e os caminhos mínimos
+# são calculados com Dijkstra em Python puro.
+import heapq
+import math
+import os
+import random
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # Funciona sem NumPy, só fica mais lento para calcular a matriz
+    np = None
+
+CABECALHO_MATRIZ = struct.Struct("<4sI")  # Marcador e número de pontos do arquivo de cache
+MARCADOR_MATRIZ = b"MTZ1"
+LADO_PADRAO = 0.67  # Lado do quadrado da topologia aleatória: distância média ~0,35, a média do antigo uniform(0.1, 0.6)
+
+_cache = {}  # (caminho, data de modificação) -> Topologia, para não recalcular dentro do mesmo processo
+
+class Topologia:
+    def __init__(self, numero_pontos, matriz, coordenadas=None):
+        self.numero_pontos = numero_pontos
+        self.matriz = matriz  # numpy.ndarray (n x n) ou array('f') plano com n*n posições
+        self.coordenadas = coordenadas  # Lista de (x, y) por ponto, se a rede veio de coordenadas
+
+    def tempo(self, origem, destino): # Tempo de viagem entre dois pontos, O(1)
+        if np is not None:
+            return float(self.matriz[origem, destino])
+        return self.matriz[origem * self.numero_pontos + destino]
+
+    # Grafo completo a partir de coordenadas
+    @classmethod
+    def de_coordenadas(cls, coordenadas, velocidade=1.0):
+        n = len(coordenadas)
+        if np is not None:
+            pontos = np.asarray(coordenadas, dtype=np.float64)
+            diferencas = pontos[:, None, :] - pontos[None, :, :]
+            matriz = (np.sqrt((diferencas ** 2).sum(axis=2)) / velocidade).astype(np.float32)
+        else:
+            matriz = array("f", (math.dist(a, b) / velocidade for a in coordenadas for b in coordenadas))
+        return cls(n, matriz, [tuple(c) for c in coordenadas])
+
+    # Pontos espalhados aleatoriamente em um quadrado (usa o gerador informado, para respeitar a semente)
+    @classmethod
+    def aleatoria(cls, numero_pontos, lado=LADO_PADRAO, rng=random):
+        return cls.de_coordenadas([(rng.uniform(0, lado), rng.uniform(0, lado)) for _ in range(numero_pontos)])
+
+    # Grafo com arestas (origem, destino, tempo); os tempos entre todos os pares são os caminhos mínimos
+    @classmethod
+    def de_arestas(cls, numero_pontos, arestas, direcionado=False):
+        n = numero_pontos
+        if np is not None:
+            # Floyd-Warshall vetorizado: n passos de O(n^2) feitos pelo NumPy
+            matriz = np.full((n, n), np.inf, dtype=np.float64)
+            np.fill_diagonal(matriz, 0.0)
+            for origem, destino, tempo in arestas:
+                matriz[origem, destino] = min(matriz[origem, destino], tempo)
+                if not direcionado:
+                    matriz[destino, origem] = min(matriz[destino, origem], tempo)
+            for k in range(n):
+                np.minimum(matriz, matriz[:, k, None] + matriz[None, k, :], out=matriz)
+            desconexo = bool(np.isinf(matriz).any())
+            matriz = matriz.astype(np.float32)
+        else:
+            # Dijkstra a partir de cada ponto
+            vizinhos = [[] for _ in range(n)]
+            for origem, destino, tempo in arestas:
+                vizinhos[origem].append((destino, tempo))
+                if not direcionado:
+                    vizinhos[destino].append((origem, tempo))
+            matriz = array("f", bytes(4 * n * n))
+            desconexo = False
+            for fonte in range(n):
+                distancias = [math.inf] * n
+                distancias[fonte] = 0.0
+                fila = [(0.0, fonte)]
+                while fila:
+                    distancia, ponto = heapq.heappop(fila)
+                    if distancia > distancias[ponto]:
+                        continue
+                    for vizinho, tempo in vizinhos[ponto]:
+                        nova = distancia + tempo
+                        if nova < distancias[vizinho]:
+                            distancias[vizinho] = nova
+                            heapq.heappush(fila, (nova, vizinho))
+                desconexo = desconexo or math.inf in distancias
+                matriz[fonte * n:(fonte + 1) * n] = array("f", distancias)
+        if desconexo:
+            raise ValueError("O grafo é desconexo: há pontos que não alcançam outros pontos.")
+        return cls(n, matriz)
+
+    # Grava a matriz em binário (cabeçalho + n*n float32 little-endian)
+    # Grava em um temporário e renomeia, então uma gravação interrompida nunca deixa um cache incompleto no caminho
+    def salvar_matriz(self, caminho):
+        dados = self.matriz.astype("<f4").tobytes() if np is not None else self._bytes_le(self.matriz)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(CABECALHO_MATRIZ.pack(MARCADOR_MATRIZ, self.numero_pontos))
+            arquivo.write(dados)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar_matriz(cls, caminho):
+        with open(caminho, "rb") as arquivo:
+            marcador, n = CABECALHO_MATRIZ.unpack(arquivo.read(CABECALHO_MATRIZ.size))
+            if marcador != MARCADOR_MATRIZ:
+                raise ValueError(f"Arquivo de matriz inválido: {caminho}")
+            dados = arquivo.read(4 * n * n)
+        if np is not None:
+            return cls(n, np.frombuffer(dados, dtype="<f4").reshape(n, n).astype(np.float32))
+        matriz = array("f")
+        matriz.frombytes(dados)
+        if sys.byteorder == "big":
+            matriz.byteswap()
+        return cls(n, matriz)
+
+    @staticmethod
+    def _bytes_le(matriz):
+        copia = array("f", matriz)
+        if sys.byteorder == "big":
+            copia.byteswap()
+        return copia.tobytes()
+
+# Lê um arquivo de topologia. Cada linha não vazia (e sem "#") é:
+#   "x,y"                  -> coordenadas do ponto (a linha i é o ponto i)
+#   "origem,destino,tempo" -> aresta não direcionada com tempo de viagem
+# Para arquivos de arestas a matriz de caminhos mínimos é gravada em "<arquivo>.matriz"
+# e reaproveitada enquanto o arquivo de topologia não for alterado.
+def carregar_topologia(caminho):
+    chave = (os.path.abspath(caminho), os.path.getmtime(caminho))
+    if chave in _cache:
+        return _cache[chave]
+
+    linhas = []
+    with open(caminho) as arquivo:
+        for linha in arquivo:
+            linha = linha.split("#", 1)[0].strip()
+            if linha:
+                linhas.append([campo.strip() for campo in linha.split(",")])
+    if linhas and not _numerico(linhas[0][0]):
+        linhas = linhas[1:]  # Cabeçalho
+    if not linhas:
+        raise ValueError(f"Arquivo de topologia vazio: {caminho}")
+
+    if len(linhas[0]) == 2:
+        topologia = Topologia.de_coordenadas([(float(x), float(y)) for x, y in linhas])
+    elif len(linhas[0]) == 3:
+        caminho_cache = caminho + ".matriz"
+        if os.path.exists(caminho_cache) and os.path.getmtime(caminho_cache) >= chave[1]:
+            topologia = Topologia.carregar_matriz(caminho_cache)
+        else:
+            arestas = [(int(o), int(d), float(t)) for o, d, t in linhas]
+            numero_pontos = 1 + max(max(o, d) for o, d, _ in arestas)
+            topologia = Topologia.de_arestas(numero_pontos, arestas)
+            try:
+                topologia.salvar_matriz(caminho_cache)
+            except OSError:  # Ex.: grafo em uma pasta somente leitura; a execução segue sem o cache
+                pass
+    else:
+        raise ValueError(f"Formato de topologia não reconhecido em {caminho}: use 'x,y' ou 'origem,destino,tempo'.")
+
+    _cache[chave] = topologia
+    return topologia
+
+def _numerico(texto):
+    try:
+        float(texto)
+        return True
+    except ValueError:
+        return False
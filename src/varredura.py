@@ -0,0 +1,106 @@
+# Varredura de parâmetros: executa muitas simulações independentes em paralelo
+# Cada execução roda em um processo próprio, com configuração e pasta de rastros isoladas,
+# e as métricas de todas são reunidas em uma única tabela.
+import argparse
+import csv
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from rastros import FORMATOS
+from roteamento import ROTEAMENTOS
+from simulacao_logistica import InterfaceNula, main, preparar_diretorio_rastros, validar_parametros
+
+# Colunas da tabela de resultados, na ordem em que são gravadas no CSV
+COLUNAS = [
+    "numero_pontos", "numero_veiculos", "capacidade_veiculo", "numero_encomendas", "semente", "modo", "roteamento", "topologia",
+    "encomendas_entregues", "makespan", "latencia_media", "latencia_p95", "utilizacao_veiculos",
+    "tempo_execucao", "eventos_processados", "diretorio_rastros", "formato_rastros", "erro",
+]
+
+# Executa uma única simulação (precisa ser uma função de módulo para ser enviada ao processo filho)
+def executar_execucao(config):
+    preparar_diretorio_rastros(config["diretorio_rastros"])
+    return main(InterfaceNula(), config)
+
+# Monta a configuração de cada execução a partir da grade (S, C, A, P), das sementes e das políticas de rota
+def montar_configuracoes(grade, sementes, diretorio_base="varredura", modo="eventos", formato_rastros="jsonl", roteamentos=("ciclico",), topologia=None):
+    configuracoes = []
+    for (S, C, A, P), semente, roteamento in itertools.product(grade, sementes, roteamentos):
+        validar_parametros(S, C, A, P)
+        configuracoes.append({
+            "numero_pontos": S,
+            "numero_veiculos": C,
+            "capacidade_veiculo": A,
+            "numero_encomendas": P,
+            "modo": modo,
+            "semente": semente,
+            "inicio_relogio": 0.0,  # Relógio fixo: com a semente, a mesma linha sai idêntica em toda varredura
+            "diretorio_rastros": os.path.join(diretorio_base, f"S{S}_C{C}_A{A}_P{P}_semente{semente}_{roteamento}"),
+            "formato_rastros": formato_rastros,
+            "roteamento": roteamento,
+            "topologia": topologia,
+        })
+    return configuracoes
+
+# Executa toda a grade em um pool de processos e devolve uma linha de métricas por execução
+# "processos" = None usa todos os núcleos da máquina
+# Uma execução que falha não interrompe a grade: vira uma linha com os parâmetros e a coluna "erro" preenchida.
+def executar_varredura(grade, sementes=(0,), diretorio_base="varredura", processos=None, modo="eventos", formato_rastros="jsonl", roteamentos=("ciclico",), topologia=None):
+    configuracoes = montar_configuracoes(grade, sementes, diretorio_base, modo, formato_rastros, roteamentos, topologia)
+    linhas = []
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = [pool.submit(executar_execucao, config) for config in configuracoes]
+        for config, futuro in zip(configuracoes, futuros):
+            try:
+                linhas.append(futuro.result())
+            except Exception as e:
+                linhas.append({**config, "erro": f"{type(e).__name__}: {e}"})
+    return linhas
+
+# Grava a tabela de resultados em CSV
+def salvar_tabela(linhas, caminho):
+    with open(caminho, "w", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS, extrasaction="ignore")
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+# Linha de comando: python varredura.py -S 5 10 -C 2 4 -A 10 -P 100 1000 --sementes 0 1 2
+def executar_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Varredura paralela de parâmetros da simulação de logística.")
+    parser.add_argument("-S", type=int, nargs="+", required=True, help="Valores de número de pontos")
+    parser.add_argument("-C", type=int, nargs="+", required=True, help="Valores de número de veículos")
+    parser.add_argument("-A", type=int, nargs="+", required=True, help="Valores de capacidade dos veículos")
+    parser.add_argument("-P", type=int, nargs="+", required=True, help="Valores de número de encomendas")
+    parser.add_argument("--sementes", type=int, nargs="+", default=[0], help="Sementes (uma execução por semente)")
+    parser.add_argument("--roteamento", nargs="+", choices=list(ROTEAMENTOS), default=["ciclico"], help="Políticas de rota a comparar")
+    parser.add_argument("--topologia", default=None, help="'aleatoria' ou arquivo de topologia usado em todas as execuções")
+    parser.add_argument("--processos", type=int, default=None, help="Número de processos (padrão: todos os núcleos)")
+    parser.add_argument("--saida", default="varredura", help="Pasta base dos rastros de cada execução")
+    parser.add_argument("--formato-rastros", choices=FORMATOS, default="jsonl", help="Formato dos rastros de cada execução")
+    parser.add_argument("--tabela", default=None, help="Arquivo CSV de resultados (padrão: <saida>/resultados.csv)")
+    args = parser.parse_args(argv)
+
+    # Combinações inválidas (ex.: A <= C) são descartadas em vez de abortar a varredura inteira
+    grade = []
+    for S, C, A, P in itertools.product(args.S, args.C, args.A, args.P):
+        try:
+            validar_parametros(S, C, A, P)
+        except ValueError as ve:
+            print(f"Ignorando S={S} C={C} A={A} P={P}: {ve}", file=sys.stderr)
+            continue
+        grade.append((S, C, A, P))
+    if not grade:
+        parser.error("Nenhuma combinação válida de parâmetros.")
+
+    linhas = executar_varredura(grade, args.sementes, args.saida, args.processos, formato_rastros=args.formato_rastros, roteamentos=args.roteamento, topologia=args.topologia)
+    os.makedirs(args.saida, exist_ok=True)
+    caminho = args.tabela or os.path.join(args.saida, "resultados.csv")
+    salvar_tabela(linhas, caminho)
+    erros = sum(1 for linha in linhas if linha.get("erro"))
+    print(f"{len(linhas)} execuções gravadas em {caminho}" + (f" ({erros} com erro)" if erros else ""))
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    sys.exit(executar_cli())